@@ -1,11 +1,21 @@
+import asyncio
+import json
+
 from sanic import Sanic
 from .config import AppConfig
 from .components.middleware import Middleware
 from .components.ratelimit import Ratelimiter
 from .components.analytics import Analytics
 from .components.cache import Cache
+from .components.listener import PostgresListener
+from .components.ingestion import IngestionWatcher
+from .components.catalog import Catalog
+from .components.renderer import Renderer
+from .components.warmer import CacheWarmer
+from .components.prerender import Prerenderer
 from .components.blueprint import BlueprintLoader
 from .components.errors import ErrorHandler
+from .components.generate import preload as preload_image_assets
 from .entities.entities import Entities
 from .utils.logger import Logger
 from .utils.webhook import ErrorWebhook
@@ -23,6 +33,10 @@ from os import cpu_count
 load_dotenv(dotenv_path=".env")
 
 
+# Intervalle de journalisation des compteurs internes (cache, rate limiting), en secondes (0 pour désactiver)
+_STATS_LOG_INTERVAL = int(environ.get("STATS_LOG_INTERVAL", 300))
+
+
 # Initialisation de l'application
 app = Sanic(
     name="CROUStillantAPI",
@@ -124,7 +138,7 @@ app.ext.openapi.describe(
 app.ctx.logs = Logger("logs")
 
 # Enregistrement du rate limiter
-app.ctx.ratelimiter = Ratelimiter()
+app.ctx.ratelimiter = Ratelimiter(app)
 
 # Enregistrement des middlewares
 Middleware(app)
@@ -132,9 +146,27 @@ Middleware(app)
 # Enregistrement du cache
 app.ctx.cache = Cache(app)
 
+# Enregistrement de l'écoute des notifications PostgreSQL
+app.ctx.listener = PostgresListener(app)
+
+# Enregistrement de la détection des ingestions (invalidation du cache)
+app.ctx.ingestion = IngestionWatcher(app)
+
+# Enregistrement du catalogue des restaurants en mémoire
+app.ctx.catalog = Catalog(app)
+
+# Enregistrement du rendu des images des menus
+app.ctx.renderer = Renderer(app)
+
 # Enregistrement des statistiques d'analyse
 Analytics(app)
 
+# Enregistrement du préchauffage du cache
+app.ctx.warmer = CacheWarmer(app)
+
+# Enregistrement du pré-rendu des images des menus
+app.ctx.prerenderer = Prerenderer(app)
+
 # Enregistrement des routes
 BlueprintLoader(app).register()
 
@@ -180,11 +212,41 @@ async def setup_app(app: Sanic):
 
     app.ctx.logs.debug(f"Utilisation de {max_workers} workers pour le ThreadPoolExecutor.")
 
+    # Polices et images des menus chargées une seule fois, avant le premier rendu
+    try:
+        await app.loop.run_in_executor(app.ctx.executor, preload_image_assets)
+    except OSError as e:
+        app.ctx.logs.warning(f"Impossible de précharger les ressources des images : {e}")
+
     app.ctx.entities = Entities(app.ctx.pool)
 
+    # Compteurs de rate limiting partagés via la connexion Redis du cache (RATELIMIT_BACKEND=redis)
+    app.ctx.ratelimiter.redis = app.ctx.cache.redis
+
     app.ctx.logs.info("API démarrée")
 
 
+@app.listener("after_server_start")
+async def start_stats_report(app: Sanic):
+    if _STATS_LOG_INTERVAL > 0:
+        app.add_task(report_stats(app), name="stats_report")
+
+
+async def report_stats(app: Sanic):
+    """
+    Tâche de fond qui journalise les compteurs internes du worker à intervalle régulier
+
+    :param app: Instance de l'application Sanic
+    """
+    while True:
+        try:
+            await asyncio.sleep(_STATS_LOG_INTERVAL)
+            app.ctx.logs.info(f"Cache : {json.dumps(app.ctx.cache.stats())}")
+            app.ctx.logs.info(f"Rate limiting : {json.dumps(app.ctx.ratelimiter.stats())}")
+        except asyncio.CancelledError:
+            break
+
+
 @app.listener("after_server_stop")
 async def close_app(app: Sanic):
     if hasattr(app.ctx, "error_webhook"):
@@ -3,16 +3,25 @@ import hashlib
 import logging
 from typing import TYPE_CHECKING
 
+from ..utils.journal import SpillJournal
+from ..utils.rollups import RollupAggregator
 from sanic import Sanic, Request
 from json import dumps
+from asyncpg.exceptions import DataError, PostgresConnectionError, PostgresError
+from dotenv import load_dotenv
+from os import environ
+from random import random
 
 if TYPE_CHECKING:
-    from asyncpg import Pool
+    from asyncpg import Connection, Pool
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
+load_dotenv(dotenv_path=".env")
+
+
 def sanitize_for_json(data: dict) -> dict:
     """
     Assainit un dictionnaire pour qu'il puisse être sérialisé en JSON
@@ -49,6 +58,15 @@ def sanitize_for_json(data: dict) -> dict:
     return sanitized
 
 
+_TABLE = "requests_logs"
+_COLUMNS = (
+    "id", "key", "method", "path", "status", "params", "request_headers",
+    "ratelimit_limit", "ratelimit_remaining", "ratelimit_used",
+    "ratelimit_reset", "ratelimit_bucket", "process_time",
+    "api_version", "hashed_ip",
+)
+
+# Requête de repli si le COPY binaire échoue (ex : valeur refusée par l'encodeur binaire)
 _INSERT_SQL = """
     INSERT INTO requests_logs (
         id, key, method, path, status, params, request_headers,
@@ -60,13 +78,143 @@ _INSERT_SQL = """
     )
 """
 
+# Plusieurs workers peuvent enregistrer la même minute : les compteurs et histogrammes sont additionnés
+_UPSERT_ROLLUPS_SQL = """
+    INSERT INTO requests_rollups AS r (
+        minute, route, status, bucket, key, count, total_time, latency
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, $7, $8
+    )
+    ON CONFLICT (minute, route, status, bucket, key) DO UPDATE SET
+        count = r.count + EXCLUDED.count,
+        total_time = r.total_time + EXCLUDED.total_time,
+        latency = ARRAY(
+            SELECT a + b
+            FROM unnest(r.latency, EXCLUDED.latency) WITH ORDINALITY AS t(a, b, i)
+            ORDER BY i
+        )
+"""
+
 _BATCH_SIZE = 500
 _FLUSH_INTERVAL = 10        # seconds
 _MAX_QUEUE_SIZE = 50_000    # drop oldest entries beyond this to prevent OOM
+_SPILL_DIR = environ.get("ANALYTICS_SPILL_DIR", "spill/analytics")
+_SPILL_THRESHOLD = int(environ.get("ANALYTICS_SPILL_THRESHOLD", 5_000))  # spill to disk beyond this during outages
+_RAW_SAMPLE_RATE = float(environ.get("ANALYTICS_RAW_SAMPLE_RATE", 1.0))  # share of 2xx requests logged raw
+_MAX_ROLLUPS = 100_000      # drop oldest rollups beyond this during outages
+_MAX_CAPTURED = _MAX_QUEUE_SIZE  # drop new captures beyond this while a flush is stuck
 _ERROR_LOG_INTERVAL = 60    # seconds between repeated error log lines
 
 
-# Tuple shape written to _queue on each request
+def _parse_headers(value: str) -> frozenset[str] | None:
+    """
+    Analyse la liste des en-têtes enregistrés dans les logs
+
+    :param value: Noms d'en-têtes séparés par des virgules, ou ``*`` pour tous les en-têtes
+    :return: Les noms d'en-têtes en minuscules, ou None pour tous les en-têtes
+    """
+    if value.strip() == "*":
+        return None
+
+    return frozenset(name.strip().lower() for name in value.split(",") if name.strip())
+
+
+def _parse_sample_rates(value: str) -> tuple[tuple[str, float], ...]:
+    """
+    Analyse les taux d'échantillonnage par route
+
+    :param value: Paires ``suffixe:taux`` séparées par des virgules (ex : ``/preview:0.01``)
+    :return: Les paires (suffixe du chemin, taux)
+    """
+    rates = []
+    for item in value.split(","):
+        suffix, _, rate = item.strip().rpartition(":")
+        if suffix:
+            rates.append((suffix, float(rate)))
+
+    return tuple(rates)
+
+
+_HEADERS = _parse_headers(
+    environ.get(
+        "ANALYTICS_HEADERS",
+        "user-agent,referer,origin,accept-language,cf-ipcountry,x-api-key",
+    )
+)
+_ROUTE_SAMPLE_RATES = _parse_sample_rates(
+    environ.get("ANALYTICS_ROUTE_SAMPLE_RATES", "/preview:0.01,/favicon.ico:0.01")
+)
+
+
+def _sample_rate(path: str) -> float:
+    """
+    Retourne le taux d'échantillonnage des logs bruts d'un chemin
+
+    :param path: Chemin de la requête
+    :return: Le taux de la première route correspondante, ou ``ANALYTICS_RAW_SAMPLE_RATE``
+    """
+    for suffix, rate in _ROUTE_SAMPLE_RATES:
+        if path.endswith(suffix):
+            return rate
+
+    return _RAW_SAMPLE_RATE
+
+
+_RATELIMIT_HEADERS = (
+    "x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-used",
+    "x-ratelimit-reset", "x-ratelimit-bucket",
+)
+
+
+def _capture_headers(headers) -> dict:
+    """
+    Copie les en-têtes de requête enregistrés selon ``ANALYTICS_HEADERS``, hors ``cookie``,
+    afin de ne pas conserver l'objet de la requête jusqu'au flush
+
+    :param headers: En-têtes de la requête
+    :return: Les en-têtes enregistrés, avec des noms en minuscules
+    """
+    if _HEADERS is None:
+        return {
+            name.lower(): value for name, value in headers.items() if name.lower() != "cookie"
+        }
+
+    return {name: headers[name] for name in _HEADERS if name in headers}
+
+
+def _rollup_key(request: Request) -> str:
+    """
+    Retourne la clé API sous laquelle une requête est agrégée.
+
+    Seules les clés présentes dans la table ``bucket`` sont conservées : une clé inconnue
+    est agrégée sous ``"invalid"``, pour qu'un client faisant varier l'en-tête ``X-API-Key``
+    ne crée pas un agrégat par requête.
+
+    :param request: Request
+    :return: La clé API, ``""`` sans clé, ou ``"invalid"``
+    """
+    apikey = request.headers.get("x-api-key", "")
+    if not apikey or apikey in request.app.ctx.ratelimiter.buckets:
+        return apikey
+
+    return "invalid"
+
+
+# Raw data captured on each request, turned into a _QueueEntry at flush time
+_Capture = tuple[
+    str,        # id
+    str,        # method
+    str,        # path
+    int,        # status
+    dict,       # request args
+    dict,       # logged request headers (ANALYTICS_HEADERS)
+    str | None, # api key
+    dict,       # ratelimit response headers
+    int,        # process_time
+    str,        # client ip (CF-Connecting-IP if present)
+]
+
+# Row shape written to _queue and inserted in requests_logs
 _QueueEntry = tuple[
     str,        # id
     str | None, # key
@@ -86,6 +234,41 @@ _QueueEntry = tuple[
 ]
 
 
+def _build_rows(captured: list[_Capture], api_version: str) -> list[_QueueEntry]:
+    """
+    Construit les lignes de logs à partir des données capturées : assainissement et
+    sérialisation JSON des paramètres et en-têtes, hachage de l'adresse IP.
+
+    :param captured: Données brutes capturées par le middleware de réponse
+    :param api_version: Version de l'API
+    :return: Les lignes à insérer
+    """
+    rows = []
+    for (
+        request_id, method, path, status, args,
+        logged_headers, apikey, response_headers, process_time, client_ip,
+    ) in captured:
+        rows.append((
+            request_id,
+            apikey,
+            method,
+            path,
+            status,
+            dumps(sanitize_for_json(args)),
+            dumps(sanitize_for_json(logged_headers)),
+            response_headers.get("x-ratelimit-limit", -1),
+            response_headers.get("x-ratelimit-remaining", -1),
+            response_headers.get("x-ratelimit-used", -1),
+            response_headers.get("x-ratelimit-reset", -1),
+            response_headers.get("x-ratelimit-bucket", -1),
+            process_time,
+            api_version,
+            hashlib.blake2b(client_ip.encode(), digest_size=20).hexdigest(),
+        ))
+
+    return rows
+
+
 class Analytics:
     """
     Classe pour les statistiques d'analyse des requêtes.
@@ -93,6 +276,16 @@ class Analytics:
     Les entrées de log sont accumulées dans une file en mémoire et insérées
     en base de données par lots via un flush périodique, afin de réduire
     la pression en écriture sur PostgreSQL.
+
+    Si la base de données est indisponible et que la file dépasse ``ANALYTICS_SPILL_THRESHOLD``
+    entrées, celles-ci sont déplacées dans un journal sur disque (``ANALYTICS_SPILL_DIR``),
+    rejoué par lots au premier flush réussi, y compris après un redémarrage.
+
+    Chaque requête est également comptabilisée dans des agrégats par minute, route, statut,
+    bucket et clé API (nombre de requêtes et histogramme de latence), enregistrés dans la
+    table ``requests_rollups`` (voir ``migrations/requests_rollups.sql``). Le log brut de chaque requête peut alors être échantillonné
+    avec ``ANALYTICS_RAW_SAMPLE_RATE`` et, par route, ``ANALYTICS_ROUTE_SAMPLE_RATES`` :
+    les réponses hors 2xx sont toujours conservées.
     """
 
     def __init__(self, app: Sanic) -> None:
@@ -101,47 +294,63 @@ class Analytics:
 
         :param app: Instance de l'application Sanic
         """
+        self._rollups = RollupAggregator()
+        self._captured: list[_Capture] = []
         self._queue: list[_QueueEntry] = []
+        self._api_version: str | None = None
         self._pool: "Pool | None" = None
         self._flush_task: asyncio.Task | None = None
         self._last_error_log: float = 0.0
         self._last_drop_log: float = 0.0
+        self.dropped_captures = 0
+        self._journal = SpillJournal(_SPILL_DIR)
 
         @app.on_response(priority=999)
         async def after_request(request: Request, response):
             """
             Middleware exécuté après chaque réponse.
-            Enqueue les métadonnées de la requête pour insertion différée.
+            Capture les données brutes de la requête pour insertion différée.
 
             :param request: Request
             :param response: Response
             """
-            headers = dict(request.headers)
-            if "cookie" in headers:
-                del headers["cookie"]
+            self._rollups.add(
+                request.uri_template or "",
+                response.status,
+                str(response.headers.get("x-ratelimit-bucket", "")),
+                _rollup_key(request),
+                request.ctx.process_time,
+            )
+
+            if 200 <= response.status < 300:
+                rate = _sample_rate(request.path)
+                if rate < 1 and random() >= rate:
+                    return
+
+            if len(self._captured) >= _MAX_CAPTURED:
+                self.dropped_captures += 1  # Flush bloqué : journalisé au prochain flush
+                self._schedule_flush()
+                return
 
-            self._queue.append((
+            # Seuls les en-têtes enregistrés sont copiés ici, la ligne est construite au flush
+            self._captured.append((
                 request.ctx.request_id,
-                headers.get("x-api-key", None),
                 request.method,
                 request.path,
                 response.status,
-                dumps(sanitize_for_json(dict(request.args))),
-                dumps(sanitize_for_json(headers)),
-                response.headers.get("x-ratelimit-limit", -1),
-                response.headers.get("x-ratelimit-remaining", -1),
-                response.headers.get("x-ratelimit-used", -1),
-                response.headers.get("x-ratelimit-reset", -1),
-                response.headers.get("x-ratelimit-bucket", -1),
+                dict(request.args),
+                _capture_headers(request.headers),
+                request.headers.get("x-api-key"),
+                {
+                    name: response.headers[name]
+                    for name in _RATELIMIT_HEADERS
+                    if name in response.headers
+                },
                 request.ctx.process_time,
-                app.config.API_VERSION,
-                hashlib.blake2b(
-                    request.headers.get("CF-Connecting-IP", request.client_ip).encode(),
-                    digest_size=20,
-                ).hexdigest(),
+                request.headers.get("cf-connecting-ip", request.client_ip),
             ))
 
-            if len(self._queue) >= _BATCH_SIZE:
+            if len(self._captured) >= _BATCH_SIZE:
                 self._schedule_flush()
 
         @app.after_server_start
@@ -152,6 +361,8 @@ class Analytics:
             :param app: Instance de l'application Sanic
             """
             self._pool = app.ctx.pool
+            self._api_version = app.config.API_VERSION
+
             app.add_task(self._flush_loop(), name="analytics_flush")
 
         @app.before_server_stop
@@ -165,6 +376,10 @@ class Analytics:
                 await self._flush_task
             await self._flush()
 
+            if self._queue:
+                await self._spill()
+            await self._journal.close()
+
     def _schedule_flush(self) -> None:
         """
         Planifie un flush en arrière-plan s'il n'y en a pas déjà un en cours,
@@ -175,17 +390,36 @@ class Analytics:
 
     async def _flush(self) -> None:
         """
-        Insère en base de données tous les logs accumulés dans la file d'attente.
-        En cas d'erreur transitoire, les entrées sont remises en file pour le prochain flush.
-        Si la file dépasse ``_MAX_QUEUE_SIZE``, les entrées les plus anciennes sont supprimées
-        pour éviter une croissance mémoire non bornée.
+        Enregistre les agrégats, construit les lignes des requêtes capturées (dans un thread),
+        insère en base de données tous les logs accumulés dans la file d'attente, puis rejoue
+        le journal sur disque s'il contient des entrées.
+        En cas d'erreur transitoire, les entrées sont remises en file pour le prochain flush
+        et déplacées sur disque au-delà de ``_SPILL_THRESHOLD``. Si l'écriture sur disque
+        échoue et que la file dépasse ``_MAX_QUEUE_SIZE``, les entrées les plus anciennes
+        sont supprimées pour éviter une croissance mémoire non bornée.
         """
-        if not self._queue or not self._pool:
+        captured, self._captured = self._captured, []
+        if self.dropped_captures:
+            dropped, self.dropped_captures = self.dropped_captures, 0
+            _LOGGER.error(
+                "Analytics capture buffer at capacity (%d) — dropped %d requests.",
+                _MAX_CAPTURED,
+                dropped,
+            )
+        if captured:
+            self._queue.extend(
+                await asyncio.to_thread(_build_rows, captured, self._api_version)
+            )
+
+        if not self._pool:
             return
+
+        await self._flush_rollups()
+
         batch, self._queue = self._queue, []
         try:
-            async with self._pool.acquire() as conn:
-                await conn.executemany(_INSERT_SQL, batch)
+            if batch:
+                await self._write(batch)
         except Exception as e:
             now = asyncio.get_running_loop().time()
             if now - self._last_error_log >= _ERROR_LOG_INTERVAL:
@@ -197,6 +431,9 @@ class Analytics:
                 )
             self._queue = batch + self._queue
 
+            if len(self._queue) > _SPILL_THRESHOLD:
+                await self._spill()
+
             if len(self._queue) > _MAX_QUEUE_SIZE:
                 dropped = len(self._queue) - _MAX_QUEUE_SIZE
                 self._queue = self._queue[-_MAX_QUEUE_SIZE:]
@@ -207,6 +444,85 @@ class Analytics:
                         _MAX_QUEUE_SIZE,
                         dropped,
                     )
+            return
+
+        try:
+            await self._journal.replay(self._write, _BATCH_SIZE)
+        except Exception as e:
+            now = asyncio.get_running_loop().time()
+            if now - self._last_error_log >= _ERROR_LOG_INTERVAL:
+                self._last_error_log = now
+                _LOGGER.warning("Analytics spill replay failed: %s", e)
+
+    async def _flush_rollups(self) -> None:
+        """
+        Enregistre les agrégats accumulés. En cas d'erreur, ils sont réintégrés
+        à l'agrégateur pour le prochain flush.
+        """
+        rows = self._rollups.drain()
+        if not rows:
+            return
+
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.executemany(_UPSERT_ROLLUPS_SQL, rows)
+        except Exception as e:
+            now = asyncio.get_running_loop().time()
+            if now - self._last_error_log >= _ERROR_LOG_INTERVAL:
+                self._last_error_log = now
+                _LOGGER.warning("Analytics rollups flush failed — keeping %d rollups: %s", len(rows), e)
+
+            self._rollups.merge(rows)
+
+            dropped = self._rollups.truncate(_MAX_ROLLUPS)
+            if dropped:
+                _LOGGER.error("Analytics rollups at capacity (%d) — dropped %d oldest rollups.", _MAX_ROLLUPS, dropped)
+
+    async def _spill(self) -> None:
+        """
+        Déplace toute la file d'attente dans le journal sur disque
+        """
+        entries, self._queue = self._queue, []
+        try:
+            await self._journal.append(entries)
+        except OSError as e:
+            self._queue = entries + self._queue
+            _LOGGER.error("Analytics spill to %s failed: %s", _SPILL_DIR, e)
+
+    async def _write(self, batch: list[_QueueEntry]) -> None:
+        """
+        Insère un lot de logs avec une connexion du pool
+
+        :param batch: Lot de logs à insérer
+        """
+        async with self._pool.acquire() as conn:
+            await self._insert(conn, batch)
+
+    async def _insert(self, conn: "Connection", batch: list[_QueueEntry]) -> None:
+        """
+        Insère un lot de logs avec le protocole ``COPY`` binaire de PostgreSQL,
+        bien moins coûteux qu'un ``INSERT`` par ligne. En cas de refus du ``COPY``
+        (hors perte de connexion), le lot est inséré avec ``executemany``.
+
+        :param conn: Connexion à la base de données
+        :param batch: Lot de logs à insérer
+        """
+        try:
+            await conn.copy_records_to_table(_TABLE, records=batch, columns=_COLUMNS)
+            return
+        except PostgresConnectionError:
+            raise
+        except (PostgresError, DataError) as e:
+            now = asyncio.get_running_loop().time()
+            if now - self._last_error_log >= _ERROR_LOG_INTERVAL:
+                self._last_error_log = now
+                _LOGGER.warning(
+                    "Analytics COPY failed — falling back to executemany for %d entries: %s",
+                    len(batch),
+                    e,
+                )
+
+        await conn.executemany(_INSERT_SQL, batch)
 
     async def _flush_loop(self) -> None:
         """
@@ -1,64 +1,443 @@
 import redis.asyncio as redis
+import asyncio
 import hashlib
 import functools
+import gzip
+import logging
 import struct
+import time
 
+from ..utils.format import getFieldsFromString
 from sanic import Sanic, Request
+from sanic.request.parameters import RequestParameters
 from sanic.response import HTTPResponse, JSONResponse
 from redis import Redis
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError
+from asyncpg.exceptions import InterfaceError, PostgresConnectionError
 from dotenv import load_dotenv
 from os import environ
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pytz import timezone
+from types import SimpleNamespace
+from uuid import uuid4
 
+try:
+    import brotli
+except ImportError:  # La variante brotli des entrées est facultative
+    brotli = None
 
-def _serialize_response(response: HTTPResponse) -> bytes:
+
+_LOGGER = logging.getLogger(__name__)
+
+# Erreurs de la base de données pour lesquelles une entrée périmée peut être servie (stale-if-error)
+_STALE_IF_ERROR_EXCEPTIONS = (InterfaceError, PostgresConnectionError, OSError, TimeoutError)
+
+
+# Format binaire d'une entrée :
+# [version: 1o][status: 2o][longueur content_type: 2o][fraîche jusqu'à: 8o][etag: 16o]
+# [encodage du corps: 1o][longueur variante brotli: 4o][longueur en-têtes: 2o]
+# [content_type][en-têtes][variante brotli][corps]
+_ENTRY_VERSION = 5
+_ENTRY_HEADER = struct.Struct("!BHHd16sBIH")
+
+# En-têtes posés par les routes et conservés avec l'entrée (ex : nom du fichier d'une image)
+_CACHED_HEADERS = ("Content-Disposition", "Content-Language")
+
+# Encodage du corps principal d'une entrée
+_ENCODING_IDENTITY = 0
+_ENCODING_GZIP = 1
+
+_COMPRESS_MIN_BYTES = 1024  # en dessous, la compression ne vaut pas le surcoût
+_GZIP_LEVEL = 9             # coût payé une seule fois, au remplissage du cache
+_BROTLI_QUALITY = 9
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/geo+json", "application/javascript", "image/svg+xml")
+
+# Paramètres de requête dont l'ordre des valeurs (séparées par des virgules) est sans effet sur la réponse
+_UNORDERED_ARGS = ("fields",)
+
+
+def _is_compressible(content_type: str, body: bytes) -> bool:
+    """
+    Indique si le corps d'une réponse mérite d'être compressé
+
+    :param content_type: Content-Type de la réponse
+    :param body: Corps de la réponse
+    :return: True pour un corps textuel d'au moins ``_COMPRESS_MIN_BYTES`` octets
+    """
+    return len(body) >= _COMPRESS_MIN_BYTES and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def _serialize_response(response: HTTPResponse, fresh_until: float = 0.0) -> bytes:
     """
     Sérialise une réponse HTTP en bytes compacts.
 
-    Format binaire : ``[status: 2o][longueur content_type: 2o][content_type][body]``
+    L'ETag est un hash BLAKE2b du corps, calculé une seule fois à l'écriture de l'entrée.
+    Les corps textuels volumineux sont stockés compressés en gzip (le corps brut n'est pas
+    conservé) et, si le module ``brotli`` est installé, accompagnés d'une variante brotli.
 
     .. note::
-        Seuls le statut, le ``Content-Type`` et le corps sont sérialisés.
-        Les en-têtes ajoutés par les middlewares (``X-Request-ID``, ``X-Processing-Time``, etc.)
-        et par le décorateur ``@ratelimit`` sont recalculés à chaque requête et n'ont pas besoin
-        d'être mis en cache. Les en-têtes ``X-Cache``, ``Cache-Control`` et ``X-Cache-TTL``
-        sont injectés par le décorateur ``@cache`` lui-même après la reconstruction.
-        Les routes ne doivent pas ajouter d'en-têtes métier sur leurs réponses si
-        celles-ci sont destinées à être mises en cache.
+        Seuls le statut, le ``Content-Type``, les en-têtes de ``_CACHED_HEADERS`` et le corps
+        sont sérialisés. Les en-têtes ajoutés par les middlewares (``X-Request-ID``,
+        ``X-Processing-Time``, etc.) et par le décorateur ``@ratelimit`` sont recalculés à chaque
+        requête et n'ont pas besoin d'être mis en cache. Les en-têtes ``X-Cache``,
+        ``Cache-Control`` et ``X-Cache-TTL`` sont injectés par le décorateur ``@cache`` lui-même
+        après la reconstruction. Les autres en-têtes métier posés par une route mise en cache
+        sont perdus : ils doivent être ajoutés à ``_CACHED_HEADERS``.
 
     :param response: La réponse HTTP à sérialiser.
     :type response: HTTPResponse
+    :param fresh_until: Timestamp UNIX jusqu'auquel l'entrée est considérée comme fraîche.
+    :type fresh_until: float
     :return: La réponse sérialisée en bytes.
     :rtype: bytes
     """
-    ct = (response.content_type or "").encode()
-    header = struct.pack("!HH", response.status, len(ct))
-    return header + ct + (response.body or b"")
+    content_type = response.content_type or ""
+    ct = content_type.encode()
+    body = response.body or b""
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    headers = "".join(
+        f"{name}: {response.headers[name]}\r\n"
+        for name in _CACHED_HEADERS
+        if name in response.headers
+    ).encode()
+
+    encoding = _ENCODING_IDENTITY
+    br = b""
+    if _is_compressible(content_type, body):
+        compressed = gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            if brotli is not None:
+                br = brotli.compress(body, quality=_BROTLI_QUALITY)
+                if len(br) >= len(compressed):
+                    br = b""
+            encoding, body = _ENCODING_GZIP, compressed
+
+    header = _ENTRY_HEADER.pack(
+        _ENTRY_VERSION,
+        response.status,
+        len(ct),
+        fresh_until,
+        digest,
+        encoding,
+        len(br),
+        len(headers),
+    )
+    return header + ct + headers + br + body
+
+
+def _unpack_entry_header(data: bytes) -> tuple:
+    """
+    Lit l'en-tête d'une entrée sérialisée.
+
+    :param data: Les bytes d'une entrée sérialisée.
+    :type data: bytes
+    :return: ``(version, status, ct_len, fresh_until, digest, encoding, br_len, headers_len)``
+    :rtype: tuple
+    :raises ValueError: Si l'entrée n'est pas au format attendu.
+    """
+    header = _ENTRY_HEADER.unpack_from(data)
+    if header[0] != _ENTRY_VERSION:
+        raise ValueError(f"Version d'entrée de cache inconnue : {header[0]}")
+    return header
+
+
+def _entry_fresh_until(data: bytes) -> float:
+    """
+    Lit la date de fraîcheur d'une entrée sans désérialiser le corps.
+
+    :param data: Les bytes d'une entrée sérialisée.
+    :type data: bytes
+    :return: Timestamp UNIX jusqu'auquel l'entrée est fraîche.
+    :rtype: float
+    :raises ValueError: Si l'entrée n'est pas au format attendu.
+    """
+    return _unpack_entry_header(data)[3]
+
+
+def _accepted_encodings(request: Request) -> frozenset[str]:
+    """
+    Liste les encodages acceptés par le client (en-tête ``Accept-Encoding``)
+
+    :param request: Request
+    :return: Les encodages acceptés, hors ceux de qualité nulle
+    """
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            pass
+        if name == "*":
+            accepted.update(("gzip", "br"))
+        elif name:
+            accepted.add(name)
+    return frozenset(accepted)
+
+
+def _entry_variant(data: bytes, encodings: frozenset[str]) -> str | None:
+    """
+    Choisit la variante d'une entrée à servir, sans désérialiser le corps.
+
+    :param data: Les bytes d'une entrée sérialisée.
+    :type data: bytes
+    :param encodings: Encodages acceptés par le client
+    :type encodings: frozenset[str]
+    :return: ``"br"``, ``"gzip"``, ``"identity"``, ou None si l'entrée n'est pas compressée
+    :rtype: str | None
+    """
+    _, _, _, _, _, encoding, br_len, _ = _unpack_entry_header(data)
+    if encoding == _ENCODING_IDENTITY:
+        return None
+    if br_len and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return "identity"
+
+
+def _entry_etag(data: bytes, variant: str | None = None) -> str | None:
+    """
+    Lit l'ETag d'une entrée sans désérialiser le corps.
+
+    Chaque variante compressée a son propre ETag, dérivé de celui du corps brut.
+
+    :param data: Les bytes d'une entrée sérialisée.
+    :type data: bytes
+    :param variant: Variante servie (voir :func:`_entry_variant`)
+    :type variant: str | None
+    :return: L'ETag (entre guillemets), ou None si le statut de l'entrée n'est pas un succès.
+    :rtype: str | None
+    """
+    _, status, _, _, digest, _, _, _ = _unpack_entry_header(data)
+    if not 200 <= status < 300:
+        return None
+    if variant in ("br", "gzip"):
+        return f'"{digest.hex()}-{variant}"'
+    return f'"{digest.hex()}"'
+
+
+def _etag_matches(request: Request, etag: str | None) -> bool:
+    """
+    Vérifie si l'en-tête ``If-None-Match`` de la requête correspond à un ETag
+    (comparaison faible, RFC 9110 §13.1.2).
+
+    :param request: Request
+    :param etag: ETag de l'entrée
+    :return: True si le client possède déjà cette version de la réponse
+    """
+    if etag is None:
+        return False
+
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
 
+    return False
 
-def _deserialize_response(data: bytes) -> HTTPResponse:
+
+def _deserialize_response(data: bytes, variant: str | None = None) -> HTTPResponse:
     """
     Reconstruit une réponse HTTP à partir de bytes sérialisés.
 
-    Format binaire attendu : ``[status: 2o][longueur content_type: 2o][content_type][body]``
+    Pour une entrée compressée, ``variant`` désigne l'encodage servi ; le corps gzip
+    n'est décompressé que pour les clients qui n'acceptent aucun encodage disponible.
 
     :param data: Les bytes à désérialiser.
     :type data: bytes
+    :param variant: Variante à servir (voir :func:`_entry_variant`)
+    :type variant: str | None
     :return: La réponse HTTP reconstruite.
     :rtype: HTTPResponse
+    :raises ValueError: Si l'entrée n'est pas au format attendu.
     """
-    status, ct_len = struct.unpack("!HH", data[:4])
-    content_type = data[4:4 + ct_len].decode()
-    body = data[4 + ct_len:]
-    return HTTPResponse(body=body, status=status, content_type=content_type)
+    _, status, ct_len, _, _, encoding, br_len, headers_len = _unpack_entry_header(data)
+    offset = _ENTRY_HEADER.size
+    content_type = data[offset:offset + ct_len].decode()
+    offset += ct_len
+    headers = data[offset:offset + headers_len].decode()
+    offset += headers_len
+
+    if encoding == _ENCODING_IDENTITY:
+        body = data[offset + br_len:]
+    elif variant == "br":
+        body = data[offset:offset + br_len]
+    elif variant == "gzip":
+        body = data[offset + br_len:]
+    else:
+        body = gzip.decompress(data[offset + br_len:])
+
+    response = HTTPResponse(body=body, status=status, content_type=content_type)
+    for line in headers.split("\r\n"):
+        if line:
+            name, _, value = line.partition(": ")
+            response.headers[name] = value
+
+    etag = _entry_etag(data, variant)
+    if etag is not None:
+        response.headers["ETag"] = etag
+
+    if encoding != _ENCODING_IDENTITY:
+        response.headers["Vary"] = "Accept-Encoding"
+        if variant in ("br", "gzip"):
+            response.headers["Content-Encoding"] = variant
+
+    return response
 
 
 load_dotenv(dotenv_path=".env")
 
 
+_L1_MAX_BYTES = int(environ.get("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))  # 64 Mo par worker
+_L1_MAX_ENTRY_BYTES = int(environ.get("CACHE_L1_MAX_ENTRY_BYTES", 4 * 1024 * 1024))
+
+_LOCK_TTL = 10              # secondes, borne haute du temps de calcul d'une route
+_LOCK_POLL_INTERVAL = 0.05  # secondes entre deux vérifications de la clé par les workers en attente
+
+# Libère le verrou uniquement s'il appartient encore à ce worker
+_PARIS = timezone("Europe/Paris")
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Fonctions de préchauffage des routes mises en cache, par nom de handler (voir :meth:`Cache.warm`)
+_WARMERS: dict[str, callable] = {}
+
+
+class WarmupRequest:
+    """
+    Requête factice permettant d'exécuter une route mise en cache en dehors d'une requête HTTP.
+
+    Seuls les attributs utilisés par les routes et par :meth:`Cache.get_cache_key` sont fournis.
+    """
+
+    def __init__(self, app: Sanic, path: str, args: dict[str, str] = None) -> None:
+        """
+        :param app: Instance de l'application Sanic
+        :param path: Chemin de la requête simulée (ex : ``/v1/restaurants/1/menu``)
+        :param args: Paramètres de requête (facultatif)
+        """
+        self.app = app
+        self.path = path
+        self.args = RequestParameters({name: [value] for name, value in (args or {}).items()})
+        self.headers = {}
+        self.ctx = SimpleNamespace()
+
+
+class LocalCache:
+    """
+    Cache mémoire local (L1) propre à chaque worker, placé devant Redis.
+
+    Les entrées sont stockées sous leur forme sérialisée (bytes immuables) et évincées
+    selon une politique LRU bornée par un budget en octets. Chaque entrée expire au plus
+    tard en même temps que la clé Redis dont elle est la copie. Un index tag → clés permet
+    à chaque worker de purger ses propres copies lors d'une invalidation.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        """
+        Initialise le cache local
+
+        :param max_bytes: Budget mémoire total en octets (0 pour désactiver le cache local)
+        :param max_entry_bytes: Taille maximale d'une entrée en octets
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Récupère une entrée si elle existe et n'a pas expiré
+
+        :param key: Clé de cache
+        :return: Les données sérialisées ou None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, data, _ = entry
+        if expires <= time.monotonic():
+            self.delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, ttl: float, tags: tuple[str, ...] = ()) -> None:
+        """
+        Stocke une entrée et évince les moins récemment utilisées si le budget est dépassé
+
+        :param key: Clé de cache
+        :param data: Données sérialisées
+        :param ttl: Durée de vie restante en secondes
+        :param tags: Tags d'invalidation de l'entrée
+        """
+        self.delete(key)
+
+        if ttl <= 0 or len(data) > self.max_entry_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, data, tags)
+        self.size += len(data)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while self.size > self.max_bytes:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """
+        Supprime une entrée du cache local
+
+        :param key: Clé de cache
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self.size -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tag: str) -> None:
+        """
+        Supprime toutes les entrées portant un tag
+
+        :param tag: Tag d'invalidation
+        """
+        for key in list(self._tags.get(tag, ())):
+            self.delete(key)
+
+
 class Cache:
     """
     Classe pour gérer un cache avec Redis (Utilisation de redis-py au lieu de aioredis)
+
+    Un cache mémoire local (:class:`LocalCache`) est placé devant Redis afin que les clés
+    les plus demandées soient servies sans aller-retour réseau.
     """
 
     redis: Redis
@@ -74,7 +453,15 @@ class Cache:
         :param app: Instance de l'application Sanic
         :param redis_url: URL de connexion à Redis
         """
+        self.app = app
         self.redis = None
+        self.local = LocalCache(_L1_MAX_BYTES, _L1_MAX_ENTRY_BYTES)
+        self.hits = {"l1": 0, "redis": 0}
+        self.misses = {"l1": 0, "redis": 0}
+        self.coalesced = 0
+        self.stale = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
         self.cache_ignored_statuses = {
             400,
             401,
@@ -129,49 +516,135 @@ class Cache:
             if self.redis:
                 await self.redis.close()
 
-    async def get_cache_key(self, request: Request) -> str:
+    def stats(self) -> dict:
+        """
+        Retourne les compteurs de HIT/MISS par niveau de cache (L1 mémoire puis Redis),
+        ainsi que le nombre de réponses fusionnées et d'entrées périmées servies
+
+        :return: Statistiques du cache
         """
-        Génère une clé de cache basée sur l'URL et les paramètres de requête
+        return {
+            "l1": {
+                "hits": self.hits["l1"],
+                "misses": self.misses["l1"],
+                "entries": len(self.local),
+                "bytes": self.local.size,
+            },
+            "redis": {
+                "hits": self.hits["redis"],
+                "misses": self.misses["redis"],
+            },
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "inflight": len(self._inflight),
+        }
+
+    async def get_cache_key(
+        self, request: Request, vary: tuple[str, ...] = (), variant: str = ""
+    ) -> str:
+        """
+        Génère une clé de cache basée sur le chemin et les paramètres de requête.
+        Les listes de champs (``fields``) sont normalisées avant le calcul de la clé.
+        Le nom d'hôte n'en fait pas partie, afin que :meth:`warm` puisse recréer la clé.
 
         :param request: Request
+        :param vary: En-têtes de requête dont la valeur fait partie de la clé (facultatif)
+        :param variant: Variante négociée de la réponse (ex : format d'image) (facultatif)
         :return: Clé de cache unique
         """
-        raw_key = request.url + str(sorted(request.args.items()))
+        args = dict(request.args)
+        for name in _UNORDERED_ARGS:
+            if name in args:
+                # ?fields=nom,code et ?fields=code,nom partagent la même entrée
+                args[name] = [",".join(getFieldsFromString(",".join(args[name])))]
+
+        raw_key = request.path + str(sorted(args.items()))
+        for header in vary:
+            raw_key += f"\n{header}:{request.headers.get(header, '')}"
+        if variant:
+            raw_key += f"\n#{variant}"
         return hashlib.blake2b(raw_key.encode(), digest_size=16).hexdigest()
 
-    async def get(
-        self, request: Request, key: str = None
-    ) -> JSONResponse | HTTPResponse | None:
+    async def warm(self, name: str, path: str, args: dict[str, str] = None, **kwargs) -> bool:
         """
-        Récupère la réponse mise en cache si elle existe
+        Calcule l'entrée d'une route mise en cache si elle est absente ou périmée
 
-        :param request: Request
-        :param key: Clé de cache (facultatif)
-        :return: JSONResponse ou None
+        :param name: Nom du handler décoré par ``@cache`` (ex : ``getRestaurantMenu``)
+        :param path: Chemin de la requête simulée, qui détermine la clé de cache
+        :param args: Paramètres de requête (facultatif)
+        :param kwargs: Paramètres de la route, déjà convertis (ex : ``code=1``)
+        :return: True si l'entrée a été recalculée
+        """
+        return await _WARMERS[name](WarmupRequest(self.app, path, args), **kwargs)
+
+    async def fetch(self, cache_key: str, tags: tuple[str, ...] = ()) -> bytes | None:
+        """
+        Récupère une entrée sérialisée, d'abord dans le cache local (L1) puis dans Redis.
+        Une entrée trouvée dans Redis est recopiée dans le L1. L'entrée peut être périmée :
+        sa fraîcheur est lue avec :func:`_entry_fresh_until`.
+
+        :param cache_key: Clé de cache
+        :param tags: Tags d'invalidation de l'entrée, pour l'index du cache local
+        :return: L'entrée sérialisée ou None
         """
         if not self.redis:
             return None
 
-        if key:
-            cache_key = key
-        else:
-            cache_key = await self.get_cache_key(request)
+        cached_data = self.local.get(cache_key)
+        if cached_data is not None:
+            self.hits["l1"] += 1
+            return cached_data
+
+        self.misses["l1"] += 1
 
         try:
-            cached_data = await self.redis.get(cache_key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(cache_key)
+                pipe.pttl(cache_key)
+                cached_data, pttl = await pipe.execute()
         except RedisConnectionError:
             return None
 
         if cached_data:
             try:
-                return _deserialize_response(cached_data)
+                _entry_fresh_until(cached_data)
             except Exception:
-                # Données corrompues ou entrée au format pickle (ancien format) —
+                # Données corrompues ou entrée dans un ancien format —
                 # supprimer la clé et traiter comme un cache MISS.
                 try:
                     await self.redis.delete(cache_key)
                 except RedisConnectionError:
                     pass
+            else:
+                self.hits["redis"] += 1
+                # Le L1 ne doit jamais survivre à la clé Redis : on reprend son TTL restant
+                if pttl and pttl > 0:
+                    self.local.set(cache_key, cached_data, pttl / 1000, tags)
+                return cached_data
+
+        self.misses["redis"] += 1
+        return None
+
+    async def get(
+        self, request: Request, key: str = None
+    ) -> JSONResponse | HTTPResponse | None:
+        """
+        Récupère la réponse mise en cache si elle existe et est encore fraîche
+
+        :param request: Request
+        :param key: Clé de cache (facultatif)
+        :return: JSONResponse ou None
+        """
+        if key:
+            cache_key = key
+        else:
+            cache_key = await self.get_cache_key(request)
+
+        cached_data = await self.fetch(cache_key)
+        if cached_data and _entry_fresh_until(cached_data) > time.time():
+            return _deserialize_response(
+                cached_data, _entry_variant(cached_data, _accepted_encodings(request))
+            )
 
         return None
 
@@ -181,6 +654,7 @@ class Cache:
         response: JSONResponse | HTTPResponse,
         ttl: int,
         key: str = None,
+        tags: tuple[str, ...] = (),
     ):
         """
         Stocke une réponse dans le cache si elle a un statut 200
@@ -189,6 +663,7 @@ class Cache:
         :param response: JSONResponse
         :param key: Clé de cache (facultatif)
         :param ttl: Durée de vie du cache en secondes
+        :param tags: Tags d'invalidation de l'entrée (facultatif)
         """
         if not self.redis or response.status in self.cache_ignored_statuses:
             return
@@ -198,44 +673,503 @@ class Cache:
             else:
                 cache_key = await self.get_cache_key(request)
 
-            cached_data = _serialize_response(response)
+            await self._store(cache_key, await self.serialize(response, ttl), ttl, tags)
+
+    async def serialize(self, response: HTTPResponse, ttl: int) -> bytes:
+        """
+        Sérialise une réponse fraîche pendant ``ttl`` secondes.
+        La compression des corps volumineux est exécutée hors de la boucle d'événements.
+
+        :param response: La réponse HTTP à sérialiser
+        :param ttl: Durée de fraîcheur en secondes
+        :return: La réponse sérialisée
+        """
+        fresh_until = time.time() + ttl
+        if _is_compressible(response.content_type or "", response.body or b""):
+            return await asyncio.to_thread(_serialize_response, response, fresh_until)
+        return _serialize_response(response, fresh_until)
+
+    async def _store(
+        self, cache_key: str, cached_data: bytes, retention: int, tags: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Écrit une entrée déjà sérialisée dans Redis puis dans le cache local.
+        La clé est ajoutée à l'ensemble Redis de chacun de ses tags, dont l'expiration
+        est prolongée pour couvrir au moins celle de l'entrée.
+
+        :param cache_key: Clé de cache
+        :param cached_data: Réponse sérialisée
+        :param retention: Durée de conservation en secondes (TTL + fenêtres de périmé)
+        :param tags: Tags d'invalidation de l'entrée
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.setex(cache_key, retention, cached_data)
+                for tag in tags:
+                    pipe.sadd(f"tag:{tag}", cache_key)
+                    pipe.expire(f"tag:{tag}", retention, nx=True)
+                    pipe.expire(f"tag:{tag}", retention, gt=True)
+                await pipe.execute()
+        except RedisConnectionError:
+            return
+
+        self.local.set(cache_key, cached_data, retention, tags)
+
+    async def invalidate(self, *tags: str) -> int:
+        """
+        Purge toutes les entrées portant l'un des tags, dans le cache local puis dans Redis
+
+        :param tags: Tags d'invalidation
+        :return: Nombre de clés supprimées dans Redis
+        """
+        for tag in tags:
+            self.local.invalidate(tag)
+
+        if not self.redis or not tags:
+            return 0
+
+        tag_keys = [f"tag:{tag}" for tag in tags]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+
+            keys = list(set().union(*members))
+            deleted = 0
+            for i in range(0, len(keys), 500):
+                deleted += await self.redis.delete(*keys[i:i + 500])
+            await self.redis.delete(*tag_keys)
+        except RedisError as e:
+            _LOGGER.warning("Invalidation du cache échouée pour %s : %s", ", ".join(tags), e)
+            return 0
+
+        return deleted
+
+    async def coalesce(
+        self,
+        cache_key: str,
+        compute: callable,
+        ttl: int,
+        lock: bool = False,
+        retention: int = None,
+        tags: tuple[str, ...] = (),
+    ) -> bytes:
+        """
+        Calcule une réponse absente du cache en fusionnant les requêtes concurrentes (single-flight).
+
+        Une seule exécution de ``compute`` est lancée par clé et par worker : les requêtes
+        arrivant pendant le calcul attendent son résultat au lieu d'interroger la base de données.
+        Si ``lock`` est activé, un verrou Redis garantit en plus qu'un seul worker du cluster
+        recalcule l'entrée, les autres attendant qu'elle apparaisse dans Redis.
+
+        :param cache_key: Clé de cache
+        :param compute: Coroutine sans argument produisant la réponse
+        :param ttl: Durée de fraîcheur du cache en secondes
+        :param lock: Active le verrou distribué entre workers
+        :param retention: Durée de conservation de l'entrée en secondes (par défaut ``ttl``)
+        :param tags: Tags d'invalidation de l'entrée
+        :return: La réponse sérialisée, à reconstruire avec :func:`_deserialize_response`
+        """
+        retention = retention or ttl
+
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            try:
+                cached_data = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Si c'est le calcul partagé qui a été annulé (client déconnecté),
+                # on le relance pour cette requête ; sinon c'est nous qui sommes annulés.
+                if not pending.cancelled():
+                    raise
+            else:
+                self.coalesced += 1
+                return cached_data
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+
+        try:
+            if lock:
+                cached_data = await self._compute_locked(
+                    cache_key, compute, ttl, retention, tags
+                )
+            else:
+                cached_data = await self._compute(
+                    cache_key, compute, ttl, retention, tags
+                )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Évite l'avertissement « exception never retrieved » sans attente
+            raise
+        else:
+            future.set_result(cached_data)
+            return cached_data
+        finally:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+
+    def revalidate(
+        self,
+        cache_key: str,
+        compute: callable,
+        ttl: int,
+        lock: bool = False,
+        retention: int = None,
+        tags: tuple[str, ...] = (),
+    ) -> None:
+        """
+        Rafraîchit une entrée périmée en arrière-plan (stale-while-revalidate).
+
+        Aucun rafraîchissement n'est lancé si un calcul est déjà en cours pour cette clé.
+
+        :param cache_key: Clé de cache
+        :param compute: Coroutine sans argument produisant la réponse
+        :param ttl: Durée de fraîcheur du cache en secondes
+        :param lock: Active le verrou distribué entre workers
+        :param retention: Durée de conservation de l'entrée en secondes
+        :param tags: Tags d'invalidation de l'entrée
+        """
+        if cache_key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self.coalesce(
+                    cache_key, compute, ttl, lock=lock, retention=retention, tags=tags
+                )
+            except Exception as e:
+                _LOGGER.warning("Rafraîchissement en arrière-plan échoué pour %s : %s", cache_key, e)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _compute(
+        self,
+        cache_key: str,
+        compute: callable,
+        ttl: int,
+        retention: int,
+        tags: tuple[str, ...] = (),
+    ) -> bytes:
+        """
+        Exécute la route puis stocke la réponse si son statut peut être mis en cache
+
+        :param cache_key: Clé de cache
+        :param compute: Coroutine sans argument produisant la réponse
+        :param ttl: Durée de fraîcheur du cache en secondes
+        :param retention: Durée de conservation de l'entrée en secondes
+        :param tags: Tags d'invalidation de l'entrée
+        :return: La réponse sérialisée
+        """
+        response = await compute()
+        cached_data = await self.serialize(response, ttl)
+
+        if self.redis and response.status not in self.cache_ignored_statuses:
+            await self._store(cache_key, cached_data, retention, tags)
+
+        return cached_data
+
+    async def _compute_locked(
+        self,
+        cache_key: str,
+        compute: callable,
+        ttl: int,
+        retention: int,
+        tags: tuple[str, ...] = (),
+    ) -> bytes:
+        """
+        Variante de :meth:`_compute` protégée par un verrou Redis ``SET NX PX``.
+
+        Le worker qui obtient le verrou calcule l'entrée ; les autres interrogent Redis
+        jusqu'à ce qu'une entrée fraîche apparaisse. Si le verrou expire sans résultat ou
+        si Redis est indisponible, la route est exécutée localement.
+
+        :param cache_key: Clé de cache
+        :param compute: Coroutine sans argument produisant la réponse
+        :param ttl: Durée de fraîcheur du cache en secondes
+        :param retention: Durée de conservation de l'entrée en secondes
+        :param tags: Tags d'invalidation de l'entrée
+        :return: La réponse sérialisée
+        """
+        if not self.redis:
+            return await self._compute(cache_key, compute, ttl, retention, tags)
+
+        lock_key = f"lock:{cache_key}"
+        token = uuid4().hex
+
+        try:
+            acquired = await self.redis.set(lock_key, token, nx=True, px=_LOCK_TTL * 1000)
+        except RedisError:
+            return await self._compute(cache_key, compute, ttl, retention, tags)
+
+        if acquired:
+            try:
+                return await self._compute(cache_key, compute, ttl, retention, tags)
+            finally:
+                try:
+                    await self.redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except RedisError:
+                    pass
+
+        deadline = time.monotonic() + _LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+
             try:
-                await self.redis.setex(cache_key, ttl, cached_data)
-            except RedisConnectionError:
-                pass
+                cached_data = await self.redis.get(cache_key)
+                if cached_data and _entry_fresh_until(cached_data) > time.time():
+                    pass
+                elif not await self.redis.exists(lock_key):
+                    break  # Le détenteur du verrou a terminé sans mettre en cache (erreur, statut ignoré)
+                else:
+                    continue
+            except (RedisError, ValueError):
+                break
+
+            self.coalesced += 1
+            self.local.set(cache_key, cached_data, retention, tags)
+            return cached_data
+
+        return await self._compute(cache_key, compute, ttl, retention, tags)
+
+
+def _paris_day() -> tuple[str, int]:
+    """
+    Retourne la date du jour à Paris et le nombre de secondes jusqu'à minuit
+
+    :return: ``(date au format DD-MM-YYYY, secondes restantes)``
+    """
+    now = datetime.now(tz=_PARIS)
+    midnight = _PARIS.localize(
+        datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    )
+    return now.strftime("%d-%m-%Y"), max(int((midnight - now).total_seconds()), 1)
 
 
-def cache(ttl: int = 60, key: str = None):
+def _cache_control(ttl: int, stale_ttl: int, stale_if_error: int, private: bool = False) -> str:
+    """
+    Construit l'en-tête ``Cache-Control`` d'une route mise en cache
+
+    :param ttl: Durée de fraîcheur du cache en secondes
+    :param stale_ttl: Fenêtre stale-while-revalidate en secondes
+    :param stale_if_error: Fenêtre stale-if-error en secondes
+    :param private: Réponse propre à un client, interdite aux caches partagés
+    :return: Valeur de l'en-tête
+    """
+    value = f"{'private' if private else 'public'}, max-age={ttl}"
+    if stale_ttl:
+        value += f", stale-while-revalidate={stale_ttl}"
+    if stale_if_error:
+        value += f", stale-if-error={stale_if_error}"
+    return value
+
+
+def cache(
+    ttl: int = 60,
+    key: str = None,
+    lock: bool = False,
+    stale_ttl: int = 0,
+    stale_if_error: int = 0,
+    tags: tuple[str, ...] = (),
+    vary: tuple[str, ...] = (),
+    negotiate: tuple[str, callable] | tuple[str, callable, callable] | None = None,
+    daily: bool = False,
+):
     """
     Décorateur pour cacher automatiquement toutes les réponses d'une route
 
+    Les requêtes concurrentes sur une même clé absente du cache sont fusionnées :
+    une seule exécution de la route alimente toutes les requêtes en attente.
+
+    Une entrée périmée depuis moins de ``stale_ttl`` secondes est servie immédiatement
+    (``X-Cache: STALE``) pendant qu'une tâche de fond la rafraîchit. Si la route échoue
+    à cause de la base de données ou d'un timeout, une entrée périmée depuis moins de
+    ``stale_if_error`` secondes est servie à la place de l'erreur.
+
+    Les ``tags`` (ex : ``"restaurant:{code}"``, formatés avec les paramètres de la route)
+    permettent de purger l'entrée via :meth:`Cache.invalidate` à la fin d'une ingestion.
+
+    Chaque réponse porte un ``ETag`` fort ; une requête dont l'en-tête ``If-None-Match``
+    correspond reçoit un ``304 Not Modified`` sans corps, sans désérialiser l'entrée.
+    Les corps textuels volumineux sont compressés une seule fois, à l'écriture de l'entrée,
+    et servis en brotli ou gzip selon l'en-tête ``Accept-Encoding`` du client.
+
+    Les en-têtes ``vary`` (ex : ``"X-API-Key"``) font partie de la clé de cache : une entrée
+    est alors propre à chaque client et servie en ``Cache-Control: private``.
+
+    ``negotiate`` (ex : ``("Accept", negotiate_image_format)``) associe un en-tête à une
+    fonction qui en déduit la variante servie : seule la variante fait partie de la clé,
+    si bien que des valeurs d'en-tête équivalentes partagent la même entrée, qui reste
+    publique et porte l'en-tête ``Vary`` correspondant. Un troisième élément facultatif,
+    une fonction ``(request) -> bool``, indique si l'en-tête a réellement été consulté
+    (ex : format imposé par un paramètre de requête) ; sinon, il n'est pas ajouté à ``Vary``.
+
+    ``daily`` est destiné aux routes qui dépendent de la date du jour : la date (Europe/Paris)
+    fait partie de la clé de cache, si bien qu'aucune entrée de la veille n'est servie après
+    minuit, et le ``max-age`` envoyé aux clients ne dépasse pas minuit.
+
     :param ttl: Durée de vie du cache en secondes
     :param key: Clé de cache (facultatif)
+    :param lock: Verrou Redis pour qu'un seul worker du cluster recalcule l'entrée (facultatif)
+    :param stale_ttl: Fenêtre stale-while-revalidate en secondes (facultatif)
+    :param stale_if_error: Fenêtre stale-if-error en secondes (facultatif)
+    :param tags: Tags d'invalidation de l'entrée (facultatif)
+    :param vary: En-têtes de requête faisant partie de la clé de cache (facultatif)
+    :param negotiate: En-tête, fonction ``(request) -> str`` de négociation de la variante et,
+        éventuellement, fonction ``(request) -> bool`` indiquant si l'en-tête a été consulté (facultatif)
+    :param daily: La réponse dépend de la date du jour (facultatif)
     :return: Decorator
     """
+    retention = ttl + max(stale_ttl, stale_if_error)
+    cache_control = _cache_control(ttl, stale_ttl, stale_if_error, private=bool(vary))
+
+    def vary_headers(request: Request) -> tuple[str, ...]:
+        """
+        Retourne les en-têtes de requête dont dépend la réponse (en-tête ``Vary``)
+
+        :param request: Request
+        :return: Les en-têtes ``vary``, suivis de l'en-tête négocié s'il a été consulté
+        """
+        if negotiate and (len(negotiate) < 3 or negotiate[2](request)):
+            return (*vary, negotiate[0])
+        return vary
+
+    def control() -> str:
+        """
+        Retourne l'en-tête ``Cache-Control``, dont la fraîcheur ne dépasse pas minuit pour une route ``daily``
+
+        :return: Valeur de l'en-tête
+        """
+        if not daily:
+            return cache_control
+
+        remaining = _paris_day()[1]
+        max_age = min(ttl, remaining)
+        return _cache_control(
+            max_age, min(stale_ttl, remaining - max_age), stale_if_error, private=bool(vary)
+        )
+
+    async def entry_key(request: Request) -> str:
+        """
+        Calcule la clé de cache de la requête, variante négociée comprise
+
+        :param request: Request ou :class:`WarmupRequest`
+        :return: Clé de cache
+        """
+        if key:
+            return key
+
+        variant = negotiate[1](request) if negotiate else ""
+        if daily:
+            variant += f"@{_paris_day()[0]}"
+        return await request.app.ctx.cache.get_cache_key(request, vary, variant)
+
+    def respond(request: Request, cached_data: bytes, status: str) -> HTTPResponse:
+        """
+        Construit la réponse à partir d'une entrée du cache, ou un 304 si le client la possède déjà
+
+        :param request: Request
+        :param cached_data: Entrée sérialisée
+        :param status: Valeur de l'en-tête ``X-Cache``
+        :return: La réponse HTTP
+        """
+        variant = _entry_variant(cached_data, _accepted_encodings(request))
+        etag = _entry_etag(cached_data, variant)
+        if _etag_matches(request, etag):
+            response = HTTPResponse(status=304, headers={"ETag": etag})
+            if variant is not None:
+                response.headers["Vary"] = "Accept-Encoding"
+        else:
+            response = _deserialize_response(cached_data, variant)
+
+        response.headers["X-Cache"] = status
+        response.headers["Cache-Control"] = control()
+        response.headers["X-Cache-TTL"] = ttl
+
+        headers = vary_headers(request)
+        if headers:
+            response.headers["Vary"] = ", ".join(
+                filter(None, (response.headers.get("Vary"), *headers))
+            )
+
+        return response
 
     def decorator(func):
+        async def warm(request: Request, *args, **kwargs) -> bool:
+            """
+            Calcule l'entrée de la route si elle est absente ou périmée (voir :meth:`Cache.warm`)
+
+            :param request: Request ou :class:`WarmupRequest`
+            :return: True si l'entrée a été recalculée
+            """
+            cache: Cache = request.app.ctx.cache
+            cache_key = await entry_key(request)
+            entry_tags = tuple(tag.format(**kwargs) for tag in tags)
+
+            cached_data = await cache.fetch(cache_key, entry_tags)
+            if cached_data and _entry_fresh_until(cached_data) > time.time():
+                return False
+
+            await cache.coalesce(
+                cache_key,
+                functools.partial(func, request, *args, **kwargs),
+                ttl,
+                lock=lock,
+                retention=retention,
+                tags=entry_tags,
+            )
+            return True
+
+        _WARMERS[func.__name__] = warm
+
         @functools.wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            if not request.app.debug:
-                cached_response = await request.app.ctx.cache.get(request, key)
-                if cached_response:
-                    cached_response.headers["X-Cache"] = "HIT"
-                    cached_response.headers["Cache-Control"] = f"public, max-age={ttl}"
-                    cached_response.headers["X-Cache-TTL"] = ttl
+            if request.app.debug:
+                response = await func(request, *args, **kwargs)
+
+                response.headers["X-Cache"] = "MISS"
+                response.headers["Cache-Control"] = control()
+                response.headers["X-Cache-TTL"] = ttl
+
+                return response
+
+            cache: Cache = request.app.ctx.cache
+            cache_key = await entry_key(request)
+            compute = functools.partial(func, request, *args, **kwargs)
+            entry_tags = tuple(tag.format(**kwargs) for tag in tags)
 
-                    return cached_response
+            cached_data = await cache.fetch(cache_key, entry_tags)
+            age = time.time() - _entry_fresh_until(cached_data) if cached_data else None
 
-            response = await func(request, *args, **kwargs)
+            if age is not None and age < 0:
+                return respond(request, cached_data, "HIT")
+
+            if age is not None and age < stale_ttl:
+                cache.revalidate(
+                    cache_key, compute, ttl, lock=lock, retention=retention, tags=entry_tags
+                )
+                cache.stale += 1
+
+                return respond(request, cached_data, "STALE")
+
+            try:
+                fresh_data = await cache.coalesce(
+                    cache_key, compute, ttl, lock=lock, retention=retention, tags=entry_tags
+                )
+            except _STALE_IF_ERROR_EXCEPTIONS:
+                if age is None or age >= stale_if_error:
+                    raise
 
-            if not request.app.debug:
-                await request.app.ctx.cache.set(request, response, ttl, key)
+                cache.stale += 1
 
-            response.headers["X-Cache"] = "MISS"
-            response.headers["Cache-Control"] = f"public, max-age={ttl}"
-            response.headers["X-Cache-TTL"] = ttl
+                return respond(request, cached_data, "STALE")
 
-            return response
+            return respond(request, fresh_data, "MISS")
 
         return wrapper
 
@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import re
+
+from ..utils.opening import Opening
+from ..utils.encoder import dumps
+from sanic import Sanic
+from types import MappingProxyType
+from json import loads
+from dotenv import load_dotenv
+from os import environ
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# Intervalle de rechargement complet du catalogue, au cas où une ingestion ne serait pas détectée
+_CATALOG_REFRESH_INTERVAL = int(environ.get("CATALOG_REFRESH_INTERVAL", 300))
+
+_JSON_FIELDS = ("horaires", "paiement", "acces")
+
+# Nombre maximal de projections (``?fields=``) conservées par restaurant
+_MAX_PROJECTIONS = 16
+
+
+def _parse_restaurant(row) -> MappingProxyType:
+    """
+    Construit l'entrée d'un restaurant du catalogue, avec ses champs JSON et
+    ses jours d'ouverture déjà analysés
+
+    :param row: Ligne retournée par ``Restaurants.getCatalog``
+    :return: L'entrée, en lecture seule
+    """
+    restaurant = dict(row)
+
+    for field in _JSON_FIELDS:
+        try:
+            restaurant[field] = loads(restaurant[field]) if restaurant.get(field) else None
+        except ValueError:
+            restaurant[field] = None
+
+    restaurant["ouverture"] = (
+        Opening(restaurant["jours_ouvert"]).get() if restaurant.get("jours_ouvert") else None
+    )
+
+    return MappingProxyType(restaurant)
+
+
+class RestaurantFragments:
+    """
+    Représentations JSON pré-encodées d'un restaurant, assemblées telles quelles
+    dans les réponses (voir :class:`~.response.JSONFragments`)
+    """
+
+    __slots__ = ("data", "detail", "status", "minimal", "region", "_projections")
+
+    def __init__(self, restaurant: MappingProxyType) -> None:
+        """
+        :param restaurant: Entrée du catalogue
+        """
+        region = {
+            "code": restaurant["rid"],
+            "region": {
+                "code": restaurant["idreg"],
+                "libelle": restaurant["region"],
+            },
+            "type": {
+                "code": restaurant["idtpr"],
+                "libelle": restaurant["type"],
+            },
+            "nom": restaurant["nom"],
+            "adresse": restaurant["adresse"],
+            "latitude": restaurant["latitude"],
+            "longitude": restaurant["longitude"],
+            "horaires": restaurant["horaires"],
+            "jours_ouvert": restaurant["ouverture"],
+            "image_url": restaurant["image_url"],
+            "email": restaurant["email"],
+            "telephone": restaurant["telephone"],
+            "ispmr": restaurant["ispmr"],
+            "zone": restaurant["zone"],
+            "paiement": restaurant["paiement"],
+            "acces": restaurant["acces"],
+            "ouvert": restaurant["opened"],
+        }
+
+        # /restaurants et /restaurants/{code}
+        self.data = MappingProxyType({**region, "actif": restaurant["actif"]})
+        self.detail = dumps(dict(self.data))
+        # /restaurants/status
+        self.status = dumps(
+            {
+                "code": restaurant["rid"],
+                "nom": restaurant["nom"],
+                "region": region["region"],
+                "type": region["type"],
+                "ouvert": restaurant["opened"],
+                "actif": restaurant["actif"],
+            }
+        )
+        # /restaurants/status/minimal
+        self.minimal = dumps(
+            {
+                "code": restaurant["rid"],
+                "actif": restaurant["actif"],
+                "ouvert": restaurant["opened"],
+            }
+        )
+        # /regions/{code}/restaurants
+        self.region = dumps(region)
+
+        self._projections: dict[tuple[str, ...], bytes] = {}
+
+    def project(self, fields: tuple[str, ...]) -> bytes:
+        """
+        Retourne la représentation de ``/restaurants/{code}`` réduite à certains champs.
+        Les projections sont encodées à la première demande puis conservées.
+
+        :param fields: Champs conservés, normalisés par ``getFieldsFromString``
+        :return: Le fragment JSON encodé
+        """
+        fragment = self._projections.get(fields)
+        if fragment is None:
+            if len(self._projections) >= _MAX_PROJECTIONS:
+                self._projections.clear()
+
+            fragment = self._projections[fields] = dumps(
+                {field: value for field, value in self.data.items() if field in fields}
+            )
+
+        return fragment
+
+
+def _like(pattern: str) -> re.Pattern:
+    """
+    Convertit un motif ``ILIKE`` PostgreSQL (``%`` et ``_``) en expression régulière
+
+    :param pattern: Motif
+    :return: L'expression régulière, insensible à la casse
+    """
+    regex = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern
+    )
+    return re.compile(regex, re.IGNORECASE | re.DOTALL)
+
+
+class CatalogSnapshot:
+    """
+    Instantané immuable des restaurants et des régions, indexé par restaurant,
+    région, type, zone, statut d'ouverture et accessibilité PMR.
+
+    Chaque restaurant est accompagné de ses fragments JSON pré-encodés. Les entrées et
+    fragments des restaurants dont la ligne n'a pas changé depuis l'instantané précédent
+    sont réutilisés tels quels.
+    """
+
+    __slots__ = (
+        "restaurants",
+        "fragments",
+        "_sources",
+        "active",
+        "regions",
+        "by_rid",
+        "by_region",
+        "by_type",
+        "by_zone",
+        "by_opened",
+        "by_ispmr",
+    )
+
+    def __init__(
+        self, restaurants: list, regions: list, previous: "CatalogSnapshot | None" = None
+    ) -> None:
+        """
+        :param restaurants: Lignes retournées par ``Restaurants.getCatalog``
+        :param regions: Lignes retournées par ``Regions.getAll``
+        :param previous: Instantané précédent, dont les restaurants inchangés sont repris (facultatif)
+        """
+        entries = []
+        fragments = {}
+        sources = {}
+        for row in restaurants:
+            rid = row["rid"]
+            source = tuple(row.values())
+
+            if previous is not None and previous._sources.get(rid) == source:
+                restaurant = previous.by_rid[rid]
+                fragments[rid] = previous.fragments[rid]
+            else:
+                restaurant = _parse_restaurant(row)
+                fragments[rid] = RestaurantFragments(restaurant)
+
+            entries.append(restaurant)
+            sources[rid] = source
+
+        self.restaurants = tuple(entries)
+        self.fragments = MappingProxyType(fragments)
+        self._sources = sources
+        self.active = tuple(r for r in self.restaurants if r["actif"])
+        self.regions = MappingProxyType(
+            {region["idreg"]: MappingProxyType(dict(region)) for region in regions}
+        )
+
+        self.by_rid = MappingProxyType({r["rid"]: r for r in self.restaurants})
+        self.by_region = self._index("idreg")
+        self.by_type = self._index("idtpr")
+        self.by_zone = self._index("zone", str.lower)
+        self.by_opened = self._index("opened")
+        self.by_ispmr = self._index("ispmr")
+
+    def _index(self, field: str, normalize: callable = None) -> MappingProxyType:
+        """
+        Indexe les restaurants selon la valeur d'un champ
+
+        :param field: Nom du champ
+        :param normalize: Fonction appliquée aux valeurs non nulles (facultatif)
+        :return: Les restaurants par valeur du champ
+        """
+        index: dict = {}
+        for restaurant in self.restaurants:
+            value = restaurant[field]
+            if normalize and value is not None:
+                value = normalize(value)
+            index.setdefault(value, []).append(restaurant)
+
+        return MappingProxyType({value: tuple(items) for value, items in index.items()})
+
+    def filter(
+        self,
+        actif: bool = True,
+        ouvert: bool | None = None,
+        region: int | None = None,
+        type_: int | None = None,
+        ispmr: bool | None = None,
+        zone: str | None = None,
+    ) -> list:
+        """
+        Filtre les restaurants, avec la même sémantique que ``Restaurants.getAll``
+
+        :param actif: Uniquement les restaurants actifs
+        :param ouvert: Statut d'ouverture
+        :param region: ID de la région
+        :param type_: ID du type de restaurant
+        :param ispmr: Accessibilité PMR
+        :param zone: Zone (motif ``ILIKE``)
+        :return: Les restaurants, triés par ID
+        """
+        candidates = [self.active if actif else self.restaurants]
+        predicates = []
+
+        if actif:
+            predicates.append(lambda r: r["actif"])
+        if ouvert is not None:
+            candidates.append(self.by_opened.get(ouvert, ()))
+            predicates.append(lambda r: r["opened"] == ouvert)
+        if ispmr is not None:
+            candidates.append(self.by_ispmr.get(ispmr, ()))
+            predicates.append(lambda r: r["ispmr"] == ispmr)
+        if region is not None:
+            candidates.append(self.by_region.get(region, ()))
+            predicates.append(lambda r: r["idreg"] == region)
+        if type_ is not None:
+            candidates.append(self.by_type.get(type_, ()))
+            predicates.append(lambda r: r["idtpr"] == type_)
+        if zone is not None:
+            if "%" in zone or "_" in zone:
+                pattern = _like(zone)
+                predicates.append(lambda r: r["zone"] is not None and pattern.fullmatch(r["zone"]))
+            else:
+                candidates.append(self.by_zone.get(zone.lower(), ()))
+                predicates.append(lambda r: r["zone"] is not None and r["zone"].lower() == zone.lower())
+
+        # Parcourt le plus petit ensemble de candidats issu des index
+        smallest = min(candidates, key=len)
+
+        return [r for r in smallest if all(predicate(r) for predicate in predicates)]
+
+
+class Catalog:
+    """
+    Classe pour le catalogue en mémoire des restaurants et des régions.
+
+    Les quelques centaines de restaurants sont chargés une seule fois par worker, avec
+    leurs champs JSON et leurs jours d'ouverture déjà analysés, dans un
+    :class:`CatalogSnapshot` immuable, accompagnés de leurs représentations JSON
+    pré-encodées. Celui-ci est remplacé d'un bloc à la fin de chaque
+    tâche d'ingestion (avant l'invalidation du cache) et toutes les
+    ``CATALOG_REFRESH_INTERVAL`` secondes, si bien que les routes le consultent sans
+    aucune requête à la base de données.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self.app = app
+        self.snapshot: CatalogSnapshot | None = None
+
+        self._lock = asyncio.Lock()
+
+        app.ctx.ingestion.subscribe(self._on_ingestion, priority=100)
+
+        @app.after_server_start
+        async def start_catalog(app):
+            """
+            Charge le catalogue puis démarre son rechargement périodique
+
+            :param app: Instance de l'application Sanic
+            """
+            try:
+                await self.reload()
+            except Exception as e:
+                _LOGGER.warning("Impossible de charger le catalogue des restaurants : %s", e)
+
+            app.add_task(self._refresh_loop(), name="catalog_refresh")
+
+    async def get(self) -> CatalogSnapshot:
+        """
+        Retourne l'instantané courant, chargé à la demande s'il n'a pas encore pu l'être
+
+        :return: Le catalogue
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            async with self._lock:
+                if self.snapshot is None:
+                    await self._load()
+                snapshot = self.snapshot
+
+        return snapshot
+
+    async def reload(self) -> None:
+        """
+        Recharge le catalogue depuis la base de données et remplace l'instantané courant
+        """
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        """
+        Construit un nouvel instantané
+        """
+        entities = self.app.ctx.entities
+        restaurants, regions = await asyncio.gather(
+            entities.restaurants.getCatalog(), entities.regions.getAll()
+        )
+
+        self.snapshot = CatalogSnapshot(restaurants, regions, previous=self.snapshot)
+
+    async def _on_ingestion(self, ingestion) -> None:
+        """
+        Recharge le catalogue après une tâche d'ingestion
+
+        :param ingestion: Ingestion terminée
+        """
+        await self.reload()
+
+    async def _refresh_loop(self) -> None:
+        """
+        Tâche de fond qui recharge le catalogue à intervalle régulier
+        """
+        while True:
+            try:
+                await asyncio.sleep(_CATALOG_REFRESH_INTERVAL)
+                await self.reload()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                _LOGGER.warning("Rechargement du catalogue des restaurants échoué : %s", e)
@@ -4,6 +4,7 @@ from .ratelimit import ratelimit
 from .response import JSON
 from ..exceptions.ratelimit import RatelimitException
 from ..exceptions.forbidden import ForbiddenException
+from ..exceptions.unavailable import UnavailableException
 from sanic import Sanic
 from sanic.exceptions import NotFound, MethodNotAllowed, SanicException
 from asyncpg.exceptions import ConnectionDoesNotExistError
@@ -48,6 +49,17 @@ class ErrorHandler:
                 status=exception.status_code,
             ).generate()
 
+        @app.exception(UnavailableException)
+        async def handle_unavailable(request, exception):
+            response = JSON(
+                request=request,
+                success=False,
+                message=exception.message,
+                status=exception.status_code,
+            ).generate()
+            response.headers.update(exception.headers)
+            return response
+
         @app.exception(MethodNotAllowed)
         @ratelimit()
         async def handle_method_not_allowed(request, exception):
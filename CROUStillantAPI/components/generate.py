@@ -2,14 +2,70 @@ from ..utils.date import getCleanDate
 from ..utils.image import addCorners
 from ..utils.text import Text, splitText, shorten_px, split_px
 from ..utils.fonts import make_font
+from ..utils.assets import load_image
 from ..utils.weights import Weights
 from PIL import Image, ImageDraw
 from textwrap import shorten
 from datetime import datetime
-from json import loads
 from io import BytesIO
 
 
+_THEMES = ("light", "purple", "dark")
+
+# Échelles testées par _select_menu_layout, de la plus grande à la plus petite
+_MAX_SCALE = 1.25
+_MIN_SCALE = 0.45
+_SCALE_STEP = 0.05
+_LAYOUT_SCALES = [
+    round(_MAX_SCALE - i * _SCALE_STEP, 2)
+    for i in range(int(round((_MAX_SCALE - _MIN_SCALE) / _SCALE_STEP)) + 1)
+]
+
+# Polices de taille fixe utilisées par generate
+_FIXED_FONTS = (
+    (60, Weights.BOLD),
+    (45, Weights.BOLD),
+    (50, Weights.EXTRA_BOLD_ITALIC),
+    (50, Weights.MEDIUM_ITALIC),
+    (35, Weights.BOLD),
+    (20, Weights.SEMI_BOLD),
+)
+
+
+def _layout_font_sizes(scale: float) -> tuple[int, int]:
+    """
+    Tailles des polices des catégories et des plats pour une échelle donnée.
+
+    :param scale: Échelle du layout.
+    :type scale: float
+    :return: Taille des titres, taille des plats.
+    :rtype: tuple[int, int]
+    """
+    return max(16, int(round(40 * scale))), max(14, int(round(35 * scale)))
+
+
+def preload() -> None:
+    """
+    Charge en mémoire les polices et les images utilisées par :func:`generate`,
+    afin que le premier rendu n'ait pas à les lire sur le disque.
+    """
+    for size, weight in _FIXED_FONTS:
+        make_font(size, weight.value)
+
+    for scale in _LAYOUT_SCALES:
+        _make_fonts(*_layout_font_sizes(scale))
+    _make_fonts(14, 12)
+
+    for theme in _THEMES:
+        for name in ("background", "square", "none"):
+            load_image(f"./assets/images/themes/{theme}/{name}.png")
+
+    for rID in (1, 2, 3):
+        load_image(f"./assets/images/layers/repas-{rID}.png", (100, 100))
+
+    load_image("./assets/images/default_ru.png", (462, 295))
+
+
 def _build_menu_entries(menu: dict, title_font, dish_font, col_max_px: int) -> list[dict]:
     """
     Build drawable menu entries with wrapped text lines.
@@ -119,18 +175,8 @@ def _select_menu_layout(menu: dict, top: int, bottom: int, col_max_px: int) -> d
     :return: Layout choisi avec les tailles et les entrées formatées.
     :rtype: dict
     """
-    max_scale = 1.25
-    min_scale = 0.45
-    step = 0.05
-
-    scales = [
-        round(max_scale - i * step, 2)
-        for i in range(int(round((max_scale - min_scale) / step)) + 1)
-    ]
-
     def _candidate(scale: float) -> dict:
-        title_size = max(16, int(round(40 * scale)))
-        dish_size = max(14, int(round(35 * scale)))
+        title_size, dish_size = _layout_font_sizes(scale)
         title_font, dish_font = _make_fonts(title_size, dish_size)
         sizes = {
             "title_size": title_size,
@@ -142,12 +188,12 @@ def _select_menu_layout(menu: dict, top: int, bottom: int, col_max_px: int) -> d
         entries = _build_menu_entries(menu, title_font=title_font, dish_font=dish_font, col_max_px=col_max_px)
         return sizes, entries
 
-    lo, hi = 0, len(scales) - 1
+    lo, hi = 0, len(_LAYOUT_SCALES) - 1
     chosen = None
 
     while lo <= hi:
         mid = (lo + hi) // 2
-        sizes, entries = _candidate(scales[mid])
+        sizes, entries = _candidate(_LAYOUT_SCALES[mid])
         if _fits_two_columns(entries=entries, top=top, bottom=bottom, sizes=sizes):
             chosen = {"sizes": sizes, "entries": entries}
             hi = mid - 1  # try a larger scale (lower index)
@@ -188,7 +234,7 @@ def generate(
     """
     Génère une image du menu d'un restaurant universitaire.
 
-    :param restaurant: Restaurant universitaire.
+    :param restaurant: Restaurant universitaire (entrée du catalogue, champs JSON déjà analysés).
     :param menu: Menu du restaurant universitaire.
     :param date: Date du menu.
     :param preview: Prévisualisation de l'image.
@@ -229,7 +275,7 @@ def generate(
     else:
         colours = default_colours
 
-    image = Image.open(f"./assets/images/themes/{theme}/background.png")
+    image = load_image(f"./assets/images/themes/{theme}/background.png").copy()
     drawer = ImageDraw.Draw(image)
 
     # Titre
@@ -266,7 +312,7 @@ def generate(
     content_bottom = 1000  # 960
 
     if menu:
-        img = Image.open(f"./assets/images/themes/{theme}/square.png")
+        img = load_image(f"./assets/images/themes/{theme}/square.png")
         image.paste(img, (35, 168), img)
         image.paste(img, (658, 168), img)
 
@@ -312,7 +358,7 @@ def generate(
 
             content_y += height
     else:
-        img = Image.open(f"./assets/images/themes/{theme}/none.png")
+        img = load_image(f"./assets/images/themes/{theme}/none.png")
         image.paste(img, (35, 168), img)
 
         m = "Menu non disponible."
@@ -342,11 +388,10 @@ def generate(
     ## Image
 
     if preview:
-        img = Image.open(BytesIO(preview))
+        img = Image.open(BytesIO(preview)).resize((462, 295))
     else:
-        img = Image.open("./assets/images/default_ru.png")
+        img = load_image("./assets/images/default_ru.png", (462, 295)).copy()
 
-    img = img.resize((462, 295))
     img = addCorners(img, 20)
     image.paste(img, (1366, 51), img)
 
@@ -360,8 +405,7 @@ def generate(
         elif menu["type"] == "soir":
             rID = 3
 
-        img = Image.open(f"./assets/images/layers/repas-{rID}.png")
-        img = img.resize((100, 100))
+        img = load_image(f"./assets/images/layers/repas-{rID}.png", (100, 100))
         image.paste(img, (1723, 56), img)
 
     ## Titre
@@ -420,10 +464,7 @@ def generate(
 
     text = Text(size=20, weight=Weights.SEMI_BOLD)
     if restaurant.get("opened"):
-        if restaurant.get("horaires"):
-            horaires = loads(restaurant.get("horaires"))
-        else:
-            horaires = None
+        horaires = restaurant.get("horaires")
 
         if horaires:
             t = splitText(horaires[0], 36)
@@ -516,7 +557,7 @@ def generate(
         )
 
     if restaurant.get("paiement"):
-        paiement = loads(restaurant.get("paiement"))
+        paiement = restaurant.get("paiement")
         if paiement:
             text.draw(
                 drawer=drawer,
@@ -560,10 +601,7 @@ def generate(
             y=y + y_space * 3 + space,
         )
 
-    if restaurant.get("acces"):
-        acces = loads(restaurant.get("acces"))
-    else:
-        acces = None
+    acces = restaurant.get("acces")
 
     if restaurant.get("pmr"):
         text.draw(
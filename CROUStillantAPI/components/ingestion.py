@@ -0,0 +1,160 @@
+import asyncio
+import logging
+
+from sanic import Sanic
+from dotenv import load_dotenv
+from os import environ
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# Canal NOTIFY émis par le service d'ingestion à la fin d'une tâche
+_INGESTION_CHANNEL = environ.get("INGESTION_CHANNEL", "tache_fin")
+# Intervalle de vérification de la dernière tâche, au cas où aucune notification n'est reçue
+_INGESTION_POLL_INTERVAL = int(environ.get("INGESTION_POLL_INTERVAL", 60))
+
+
+class Ingestion:
+    """
+    Résultat d'une ou plusieurs tâches d'ingestion terminées
+    """
+
+    def __init__(self, id: int, restaurants: frozenset[int], regions: frozenset[int]) -> None:
+        """
+        :param id: ID de la dernière tâche terminée
+        :param restaurants: IDs des restaurants vérifiés par les tâches
+        :param regions: IDs des régions de ces restaurants
+        """
+        self.id = id
+        self.restaurants = restaurants
+        self.regions = regions
+
+    def tags(self) -> set[str]:
+        """
+        Retourne les tags de cache concernés par l'ingestion
+
+        :return: Les tags à invalider
+        """
+        tags = {"restaurants", "stats"}
+        tags.update(f"restaurant:{rid}" for rid in self.restaurants)
+        tags.update(f"region:{idreg}" for idreg in self.regions)
+        return tags
+
+
+class IngestionWatcher:
+    """
+    Classe pour détecter la fin des tâches d'ingestion.
+
+    La dernière tâche terminée est vérifiée à la réception d'une notification sur
+    ``INGESTION_CHANNEL`` et toutes les ``INGESTION_POLL_INTERVAL`` secondes. Lorsqu'une
+    nouvelle tâche est détectée, les fonctions abonnées sont appelées par ordre de
+    priorité décroissante avec l':class:`Ingestion` correspondante.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self.app = app
+        self.last_id: int | None = None
+
+        self._subscribers: list[tuple[int, callable]] = []
+        self._lock = asyncio.Lock()
+
+        self.subscribe(self._invalidate_cache, priority=50)
+
+        @app.after_server_start
+        async def start_watcher(app):
+            """
+            Mémorise la dernière tâche terminée puis démarre la surveillance
+
+            :param app: Instance de l'application Sanic
+            """
+            try:
+                self.last_id = await app.ctx.entities.taches.getLastFinishedId()
+            except Exception as e:
+                _LOGGER.warning("Impossible de récupérer la dernière tâche d'ingestion : %s", e)
+
+            await app.ctx.listener.listen(_INGESTION_CHANNEL, lambda _: self.check())
+            app.add_task(self._poll_loop(), name="ingestion_poll")
+
+    def subscribe(self, callback: callable, priority: int = 0) -> None:
+        """
+        Abonne une coroutine à la fin des tâches d'ingestion
+
+        :param callback: Coroutine appelée avec l':class:`Ingestion`
+        :param priority: Priorité d'appel, les plus élevées en premier
+        """
+        self._subscribers.append((priority, callback))
+        self._subscribers.sort(key=lambda subscriber: -subscriber[0])
+
+    async def check(self) -> Ingestion | None:
+        """
+        Vérifie si une nouvelle tâche d'ingestion s'est terminée et notifie les abonnés
+
+        :return: L'ingestion détectée, ou None
+        """
+        async with self._lock:
+            taches = self.app.ctx.entities.taches
+
+            last_id = await taches.getLastFinishedId()
+            if last_id is None or last_id == self.last_id:
+                return None
+
+            if self.last_id is None:
+                self.last_id = last_id  # Point de départ inconnu au démarrage
+                return None
+
+            rows = await taches.getTouchedRestaurants(self.last_id, last_id)
+            ingestion = Ingestion(
+                id=last_id,
+                restaurants=frozenset(row["rid"] for row in rows),
+                regions=frozenset(row["idreg"] for row in rows),
+            )
+            self.last_id = last_id
+
+            for _, callback in self._subscribers:
+                try:
+                    await callback(ingestion)
+                except Exception as e:
+                    _LOGGER.exception("Erreur lors du traitement de l'ingestion %s : %s", last_id, e)
+
+            return ingestion
+
+    async def _invalidate_cache(self, ingestion: Ingestion) -> None:
+        """
+        Purge les entrées de cache concernées par l'ingestion, dans le cache local puis dans Redis.
+
+        Chaque worker purge Redis après avoir rechargé son catalogue (priorité supérieure) :
+        un worker qui détecte l'ingestion en retard a pu réécrire dans Redis des réponses
+        calculées avec son ancien catalogue après la purge d'un autre worker.
+
+        :param ingestion: Ingestion terminée
+        """
+        deleted = await self.app.ctx.cache.invalidate(*ingestion.tags())
+
+        _LOGGER.info(
+            "Ingestion %s : %d restaurants, %d entrées de cache invalidées",
+            ingestion.id,
+            len(ingestion.restaurants),
+            deleted,
+        )
+
+    async def _poll_loop(self) -> None:
+        """
+        Tâche de fond qui vérifie la dernière tâche d'ingestion à intervalle régulier
+        """
+        while True:
+            try:
+                await asyncio.sleep(_INGESTION_POLL_INTERVAL)
+                await self.check()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                _LOGGER.warning("Vérification de l'ingestion échouée : %s", e)
@@ -0,0 +1,129 @@
+import asyncio
+import inspect
+import logging
+
+from sanic import Sanic
+from asyncpg import Pool, Connection
+
+
+_LOGGER = logging.getLogger(__name__)
+
+_RECONNECT_DELAY = 5  # secondes
+
+
+class PostgresListener:
+    """
+    Classe pour recevoir les notifications PostgreSQL (``LISTEN/NOTIFY``).
+
+    Une connexion dédiée est empruntée au pool pour toute la durée de vie du worker
+    et réabonnée à tous les canaux enregistrés après une perte de connexion.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self._callbacks: dict[str, list[callable]] = {}
+        self._pool: Pool | None = None
+        self._connection: Connection | None = None
+        self._lost = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+        @app.after_server_start
+        async def start_listener(app):
+            """
+            Démarre la boucle d'écoute après le démarrage du serveur
+
+            :param app: Instance de l'application Sanic
+            """
+            self._pool = app.ctx.pool
+            self._task = asyncio.create_task(self._run())
+
+        @app.before_server_stop
+        async def stop_listener(app):
+            """
+            Arrête la boucle d'écoute et rend la connexion au pool
+
+            :param app: Instance de l'application Sanic
+            """
+            if self._task is not None:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+
+            await self._release()
+
+    async def listen(self, channel: str, callback: callable) -> None:
+        """
+        Abonne une fonction à un canal de notification
+
+        :param channel: Nom du canal PostgreSQL
+        :param callback: Fonction (synchrone ou coroutine) appelée avec le payload de la notification
+        """
+        first = channel not in self._callbacks
+        self._callbacks.setdefault(channel, []).append(callback)
+
+        if first and self._connection is not None and not self._connection.is_closed():
+            await self._connection.add_listener(channel, self._dispatch)
+
+    def _dispatch(self, connection: Connection, pid: int, channel: str, payload: str) -> None:
+        """
+        Transmet une notification aux fonctions abonnées au canal
+
+        :param connection: Connexion ayant reçu la notification
+        :param pid: PID du processus PostgreSQL émetteur
+        :param channel: Nom du canal
+        :param payload: Contenu de la notification
+        """
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                result = callback(payload)
+            except Exception as e:
+                _LOGGER.warning("Erreur lors du traitement d'une notification sur %s : %s", channel, e)
+                continue
+
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    async def _run(self) -> None:
+        """
+        Maintient la connexion d'écoute ouverte et la rétablit en cas de perte
+        """
+        while True:
+            try:
+                self._lost.clear()
+                self._connection = await self._pool.acquire()
+                self._connection.add_termination_listener(lambda _: self._lost.set())
+
+                for channel in self._callbacks:
+                    await self._connection.add_listener(channel, self._dispatch)
+
+                await self._lost.wait()
+                _LOGGER.warning("Connexion d'écoute PostgreSQL perdue, reconnexion...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.warning("Impossible d'écouter les notifications PostgreSQL : %s", e)
+
+            await self._release()
+            await asyncio.sleep(_RECONNECT_DELAY)
+
+    async def _release(self) -> None:
+        """
+        Rend la connexion d'écoute au pool
+        """
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+
+        try:
+            await self._pool.release(connection)
+        except Exception:
+            connection.terminate()
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+
+from .renderer import render_key
+from ..utils.menu import select_repas
+from ..exceptions.unavailable import UnavailableException
+from sanic import Sanic
+from redis.exceptions import RedisError
+from dotenv import load_dotenv
+from os import environ
+from datetime import datetime, timedelta
+from pytz import timezone
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# Nombre de jours pré-rendus à partir d'aujourd'hui (2 : aujourd'hui et demain)
+_PRERENDER_DAYS = int(environ.get("PRERENDER_DAYS", 2))
+# Thèmes et formats pré-rendus, séparés par des virgules
+_PRERENDER_THEMES = tuple(
+    theme.strip() for theme in environ.get("PRERENDER_THEMES", "light").split(",") if theme.strip()
+)
+_PRERENDER_FORMATS = tuple(
+    format.strip() for format in environ.get("PRERENDER_FORMATS", "png,webp").split(",") if format.strip()
+)
+# Nombre de restaurants traités simultanément, pour laisser de la capacité de rendu aux requêtes
+_PRERENDER_CONCURRENCY = int(environ.get("PRERENDER_CONCURRENCY", 2))
+_PRERENDER_LOCK_TTL = 60 * 30  # secondes, un seul worker du cluster pré-rend par exécution
+
+
+class Prerenderer:
+    """
+    Classe pour pré-rendre les images des menus.
+
+    Au démarrage et après chaque tâche d'ingestion, les images des menus des
+    ``PRERENDER_DAYS`` prochains jours de chaque restaurant actif sont rendues en
+    arrière-plan, pour chaque repas du menu et chaque thème (``PRERENDER_THEMES``) et
+    format (``PRERENDER_FORMATS``), puis stockées dans le cache des rendus
+    (voir :class:`~.renderer.Renderer`). Les tâches sont identiques à celles de la route
+    ``/restaurants/{code}/menu/{date}/image`` : les requêtes des utilisateurs sont donc
+    servies depuis le cache, et le rendu a lieu après l'ingestion plutôt qu'aux heures
+    de pointe. Les images déjà en cache ne sont pas rendues de nouveau.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self.app = app
+
+        self._semaphore = asyncio.Semaphore(_PRERENDER_CONCURRENCY)
+        self._task: asyncio.Task | None = None
+        self._queued: str | None = None
+
+        app.ctx.ingestion.subscribe(self._on_ingestion, priority=20)
+
+        @app.after_server_start
+        async def start_prerender(app):
+            """
+            Pré-rend les images après le démarrage du serveur
+
+            :param app: Instance de l'application Sanic
+            """
+            if not app.debug:
+                self.schedule(f"startup:{int(time.time()) // _PRERENDER_LOCK_TTL}")
+
+        @app.before_server_stop
+        async def stop_prerender(app):
+            """
+            Annule le pré-rendu en cours avant l'arrêt du serveur
+
+            :param app: Instance de l'application Sanic
+            """
+            if self._task is not None and not self._task.done():
+                self._task.cancel()
+
+    def schedule(self, run: str) -> None:
+        """
+        Planifie un pré-rendu en arrière-plan. Si un pré-rendu est déjà en cours,
+        le suivant est lancé à sa fin.
+
+        :param run: Identifiant de l'exécution, partagé par les workers du cluster
+        """
+        if self._task is not None and not self._task.done():
+            self._queued = run
+            return
+
+        self._task = asyncio.create_task(self._run(run))
+
+    async def _on_ingestion(self, ingestion) -> None:
+        """
+        Pré-rend les images après une tâche d'ingestion
+
+        :param ingestion: Ingestion terminée
+        """
+        if not self.app.debug:
+            self.schedule(f"ingestion:{ingestion.id}")
+
+    async def _run(self, run: str) -> None:
+        """
+        Exécute les pré-rendus planifiés les uns après les autres
+
+        :param run: Identifiant de la première exécution
+        """
+        while run is not None:
+            try:
+                await self.prerender(run)
+            except Exception as e:
+                _LOGGER.warning("Pré-rendu des images %s échoué : %s", run, e)
+
+            run, self._queued = self._queued, None
+
+    async def prerender(self, run: str) -> int:
+        """
+        Pré-rend les images des menus de tous les restaurants actifs
+
+        :param run: Identifiant de l'exécution, partagé par les workers du cluster
+        :return: Nombre d'images rendues
+        """
+        redis = self.app.ctx.cache.redis
+        if not redis:
+            return 0  # Sans Redis, les images ne seraient utiles qu'à ce worker
+
+        try:
+            acquired = await redis.set(
+                f"lock:prerender:{run}", os.getpid(), nx=True, ex=_PRERENDER_LOCK_TTL
+            )
+        except RedisError:
+            return 0
+
+        if not acquired:
+            return 0  # Un autre worker s'en charge
+
+        # Même date que celle analysée par la route (minuit, sans fuseau horaire)
+        today = datetime.strptime(
+            datetime.now(tz=timezone("Europe/Paris")).strftime("%d-%m-%Y"), "%d-%m-%Y"
+        )
+        dates = [today + timedelta(days=day) for day in range(_PRERENDER_DAYS)]
+
+        catalog = await self.app.ctx.catalog.get()
+        results = await asyncio.gather(
+            *(self._prerender_restaurant(restaurant, dates) for restaurant in catalog.active)
+        )
+        rendered = sum(results)
+
+        _LOGGER.info("Pré-rendu des images %s : %d images rendues", run, rendered)
+
+        return rendered
+
+    async def _prerender_restaurant(self, restaurant, dates: list[datetime]) -> int:
+        """
+        Pré-rend les images des menus d'un restaurant
+
+        :param restaurant: Entrée du catalogue
+        :param dates: Dates des menus
+        :return: Nombre d'images rendues
+        """
+        entities = self.app.ctx.entities
+        renderer = self.app.ctx.renderer
+        rendered = 0
+
+        async with self._semaphore:
+            try:
+                preview = await entities.restaurants.getPreview(restaurant["rid"])
+                preview = preview.get("raw_image", None) if preview else None
+
+                for date in dates:
+                    menu = await entities.menus.getFromDate(id=restaurant["rid"], date=date)
+                    if not menu:
+                        continue
+
+                    for repas in dict.fromkeys(row.get("tpr") for row in menu):
+                        if repas not in ("matin", "midi", "soir"):
+                            continue
+
+                        data = select_repas(menu, date, repas)
+                        if data is None:
+                            continue
+
+                        for theme in _PRERENDER_THEMES:
+                            for format in _PRERENDER_FORMATS:
+                                job = renderer.job(
+                                    restaurant=restaurant,
+                                    menu=data,
+                                    date=date,
+                                    preview=preview,
+                                    theme=theme,
+                                    custom_colours=None,
+                                    format=format,
+                                )
+                                if await renderer.contains(render_key(job)):
+                                    continue
+
+                                await renderer.render(job)
+                                rendered += 1
+            except UnavailableException:
+                _LOGGER.debug("Pré-rendu du restaurant %s interrompu : pool de rendu saturé", restaurant["rid"])
+            except Exception as e:
+                _LOGGER.debug("Pré-rendu du restaurant %s échoué : %s", restaurant["rid"], e)
+
+        return rendered
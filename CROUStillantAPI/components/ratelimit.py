@@ -1,12 +1,49 @@
+import asyncio
 import binascii
 import functools
+import logging
 import time
 
 from ..exceptions.ratelimit import RatelimitException
 from ..exceptions.forbidden import ForbiddenException
+from sanic import Sanic
 from sanic.request import Request
 from sanic.response import HTTPResponse
-from asyncpg import Pool
+from asyncpg import Pool, Connection
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from dotenv import load_dotenv
+from os import environ
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# "local" : compteurs propres à chaque worker ; "redis" : compteurs partagés par tous les workers et réplicas
+_RATELIMIT_BACKEND = environ.get("RATELIMIT_BACKEND", "local").lower()
+# Nombre maximal de compteurs locaux, pour borner la mémoire lors d'un afflux d'adresses IP
+_RATELIMIT_MAX_KEYS = int(environ.get("RATELIMIT_MAX_KEYS", 100_000))
+# Canal NOTIFY signalant la modification d'un bucket (payload : la clé modifiée, vide pour tout recharger)
+_RATELIMIT_BUCKETS_CHANNEL = environ.get("RATELIMIT_BUCKETS_CHANNEL", "bucket_changed")
+# Intervalle de rechargement complet de la table des buckets, en secondes
+_RATELIMIT_BUCKETS_REFRESH = int(environ.get("RATELIMIT_BUCKETS_REFRESH", 300))
+# Délai maximal d'un appel Redis du rate limiter, en secondes, avant repli sur les compteurs locaux
+_RATELIMIT_REDIS_TIMEOUT = float(environ.get("RATELIMIT_REDIS_TIMEOUT", 0.1))
+# Durée pendant laquelle Redis n'est plus interrogé après un échec, en secondes
+_RATELIMIT_REDIS_BACKOFF = float(environ.get("RATELIMIT_REDIS_BACKOFF", 30))
+_ERROR_LOG_INTERVAL = 60  # secondes entre deux avertissements de repli sur les compteurs locaux
+
+# Incrémente atomiquement le compteur d'une fenêtre fixe et fixe son expiration à la première requête
+_CONSUME_SCRIPT = """
+local used = redis.call("INCR", KEYS[1])
+if used == 1 then
+    redis.call("EXPIRE", KEYS[1], ARGV[1])
+end
+return used
+"""
 
 
 class Bucket:
@@ -30,16 +67,53 @@ class Ratelimiter:
     """
 
     DEFAULT = Bucket("default", 200, 60)
+    BANNED = Bucket("banned", 0, 0)
 
-    def __init__(self) -> None:
+    def __init__(self, app: Sanic, backend: str = _RATELIMIT_BACKEND) -> None:
         """
-        Initialisation de la classe
+        Initialisation de la classe et enregistrement des listeners Sanic
+
+        La table ``bucket`` est chargée en mémoire au démarrage puis rechargée toutes les
+        ``RATELIMIT_BUCKETS_REFRESH`` secondes ; une notification sur ``RATELIMIT_BUCKETS_CHANNEL``
+        recharge immédiatement la clé modifiée (bannissement, limite personnalisée).
+
+        :param app: Instance de l'application Sanic
+        :param backend: Stockage des compteurs, ``local`` ou ``redis``
         """
-        self.ratelimits = {}
-        self.last_ratelimit_cleanup = int(time.time())
+        self.backend = backend
+        self.redis: Redis | None = None
+        self._consume_script = None
+        self._last_error_log = 0.0
+        self._last_evict_log = 0.0
+        self._redis_retry_at = 0.0
+        self.fallbacks = 0
+
+        # (durée, début de la fenêtre) -> {(clé, bucket): requêtes}
+        self.windows: dict[tuple[int, int], dict[tuple[str, int], int]] = {}
+        self.tracked = 0
+        self.max_keys = _RATELIMIT_MAX_KEYS
+        self.evicted = 0
+
+        self.buckets: dict[str, Bucket] = {}
+        self.buckets_loaded = False
+        self._pool: Pool | None = None
+
+        @app.after_server_start
+        async def load_buckets(app):
+            """
+            Charge les buckets et s'abonne à leurs modifications après le démarrage du serveur
 
-        self.cache_buckets = {}
-        self.cache_refresh = 300
+            :param app: Instance de l'application Sanic
+            """
+            self._pool = app.ctx.pool
+
+            try:
+                await self.load()
+            except Exception as e:
+                _LOGGER.warning("Impossible de charger les buckets de rate limiting : %s", e)
+
+            await app.ctx.listener.listen(_RATELIMIT_BUCKETS_CHANNEL, self._on_bucket_changed)
+            app.add_task(self._refresh_loop(), name="ratelimit_buckets_refresh")
 
     async def check_ratelimit(self, key: str, bucket: Bucket, error: bool = False) -> dict:
         """
@@ -50,131 +124,263 @@ class Ratelimiter:
         :param error: Indique si une erreur est survenue lors de la récupération du bucket (ex: DB indisponible)
         :return: Headers de la requête
         """
-        await self.cleanup()
-
         current_time = int(time.time())
-        self.ratelimits.setdefault(key, {})
-
         window_start = current_time // bucket.secs * bucket.secs
+        reset = window_start + bucket.secs
 
-        self.ratelimits[key].setdefault(
-            bucket.ident,
-            {
-                "remaining": bucket.limit,
-                "reset": window_start + bucket.secs,
-                "window_start": window_start,
-            },
-        )
-
-        bucket_data = self.ratelimits[key][bucket.ident]
+        used = None
+        if (
+            self.backend == "redis"
+            and self.redis is not None
+            and time.monotonic() >= self._redis_retry_at
+        ):
+            used = await self._consume_redis(key, bucket, window_start)
 
-        if current_time >= bucket_data["reset"]:
-            bucket_data["remaining"] = bucket.limit
-            bucket_data["reset"] = window_start + bucket.secs
-            bucket_data["window_start"] = window_start
+        if used is None:
+            if self.backend == "redis":
+                self.fallbacks += 1
+            used = self._consume_local(key, bucket, current_time)
 
-        bucket_data["remaining"] -= 1
+        remaining = bucket.limit - used
 
         headers = {
             "X-RateLimit-Limit": bucket.limit,
-            "X-RateLimit-Remaining": max(bucket_data["remaining"], 0),
-            "X-RateLimit-Reset": bucket_data["reset"]
-            - current_time,  # Time remaining to reset
+            "X-RateLimit-Remaining": max(remaining, 0),
+            "X-RateLimit-Reset": reset - current_time,  # Time remaining to reset
             "X-RateLimit-Bucket": bucket.ident,
-            "X-RateLimit-Used": bucket.limit - bucket_data["remaining"],
+            "X-RateLimit-Used": used,
         }
 
         if error:
             headers["X-RateLimit-Error"] = "true"
             headers["X-RateLimit-Error-Message"] = "Ratelimit bucket check failed, default bucket applied."
 
-        if bucket_data["remaining"] < 0:
-            headers.update({"Retry-After": bucket_data["reset"] - current_time})
+        if remaining < 0:
+            headers.update({"Retry-After": reset - current_time})
             raise RatelimitException(
-                headers=headers, extra={"cooldown": bucket_data["reset"] - current_time}
+                headers=headers, extra={"cooldown": reset - current_time}
             )
 
         return headers
 
-    async def cleanup(self) -> None:
+    async def _consume_redis(self, key: str, bucket: Bucket, window_start: int) -> int | None:
         """
-        Nettoie les rate limits expirées afin de libérer de la mémoire
+        Comptabilise une requête dans Redis, dans une fenêtre fixe alignée sur celle des compteurs locaux.
+
+        L'appel est abandonné au-delà de ``RATELIMIT_REDIS_TIMEOUT`` secondes (ex : Redis injoignable
+        sans refus de connexion) ; après un échec, Redis n'est plus interrogé pendant
+        ``RATELIMIT_REDIS_BACKOFF`` secondes et les compteurs locaux sont utilisés directement.
+
+        :param key: Clé de la requête
+        :param bucket: Bucket de rate limiting
+        :param window_start: Début de la fenêtre courante
+        :return: Nombre de requêtes de la fenêtre, ou None si Redis est indisponible
         """
-        current_time = int(time.time())
+        if self._consume_script is None:
+            self._consume_script = self.redis.register_script(_CONSUME_SCRIPT)
+
+        try:
+            return await asyncio.wait_for(
+                self._consume_script(
+                    keys=[f"ratelimit:{key}:{bucket.ident}:{window_start}"], args=[bucket.secs]
+                ),
+                timeout=_RATELIMIT_REDIS_TIMEOUT,
+            )
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            now = time.monotonic()
+            self._redis_retry_at = now + _RATELIMIT_REDIS_BACKOFF
+            if now - self._last_error_log >= _ERROR_LOG_INTERVAL:
+                self._last_error_log = now
+                _LOGGER.warning(
+                    "Redis indisponible pour le rate limiting, repli sur les compteurs locaux : %r", e
+                )
+            return None
+
+    def _consume_local(self, key: str, bucket: Bucket, current_time: int) -> int:
+        """
+        Comptabilise une requête dans les compteurs propres au worker.
+
+        Les compteurs sont regroupés par fenêtre ``(durée, début)`` : à l'ouverture d'une
+        nouvelle fenêtre, les fenêtres terminées sont supprimées d'un bloc, sans parcourir
+        leurs clés. Au-delà de ``RATELIMIT_MAX_KEYS`` compteurs, les fenêtres terminées sont
+        supprimées, puis, si cela ne suffit pas, les compteurs encore actifs les plus anciens.
+
+        :param key: Clé de la requête
+        :param bucket: Bucket de rate limiting
+        :param current_time: Timestamp courant
+        :return: Nombre de requêtes de la fenêtre
+        """
+        window = (bucket.secs, current_time // bucket.secs * bucket.secs)
+
+        counters = self.windows.get(window)
+        if counters is None:
+            self._expire(current_time)
+            counters = self.windows[window] = {}
+
+        slot = (key, bucket.ident)
+        used = counters.get(slot)
+        if used is None:
+            if self.tracked >= self.max_keys:
+                self._evict(current_time)
+            self.tracked += 1
+            used = 0
+
+        counters[slot] = used + 1
+        return used + 1
+
+    def _expire(self, current_time: int) -> None:
+        """
+        Supprime les fenêtres terminées
+
+        :param current_time: Timestamp courant
+        """
+        for window in list(self.windows):
+            secs, window_start = window
+            if window_start + secs <= current_time:
+                self.tracked -= len(self.windows.pop(window))
+
+    def _evict(self, current_time: int) -> None:
+        """
+        Libère de la place pour un nouveau compteur : les fenêtres terminées sont supprimées
+        en priorité ; à défaut, le compteur le plus ancien de la fenêtre la plus ancienne
+        est évincé, ce qui redonne un quota complet au client concerné.
 
-        if current_time - self.last_ratelimit_cleanup < 60:
+        :param current_time: Timestamp courant
+        """
+        self._expire(current_time)
+        if self.tracked < self.max_keys:
             return
 
-        for key, buckets in self.ratelimits.items():
-            for bucket, data in list(buckets.items()):
-                if data["reset"] < current_time:
-                    del self.ratelimits[key][bucket]
+        for window, counters in self.windows.items():
+            if counters:
+                del counters[next(iter(counters))]
+                self.tracked -= 1
+                self.evicted += 1
+                break
+
+        now = time.monotonic()
+        if now - self._last_evict_log >= _ERROR_LOG_INTERVAL:
+            self._last_evict_log = now
+            _LOGGER.warning(
+                "Limite de %d compteurs de rate limiting atteinte, éviction de compteurs actifs (%d au total)",
+                self.max_keys,
+                self.evicted,
+            )
 
-        self.last_ratelimit_cleanup = current_time
+    def stats(self) -> dict:
+        """
+        Retourne l'état des compteurs locaux de rate limiting, ainsi que le nombre de requêtes
+        comptabilisées localement faute de Redis et la durée restante avant de le réinterroger
 
-    async def getBucket(self, pool: Pool, key: str) -> Bucket:
+        :return: Statistiques du rate limiter
         """
-        Récupère un bucket, soit depuis le cache, soit depuis la base de données si le cache est expiré ou inexistant.
-        Permet de limiter les requêtes à la base de données et avoir des buckets dynamiques.
+        return {
+            "backend": self.backend,
+            "tracked": self.tracked,
+            "max_keys": self.max_keys,
+            "windows": len(self.windows),
+            "evicted": self.evicted,
+            "fallbacks": self.fallbacks,
+            "redis_backoff": max(round(self._redis_retry_at - time.monotonic(), 1), 0),
+            "buckets": len(self.buckets),
+        }
 
-        :param pool: Pool de connexions à la base de données
-        :param key: Clé de la requête (IP ou API Key)
+    @classmethod
+    def _to_bucket(cls, row) -> Bucket:
+        """
+        Construit un bucket à partir d'une ligne de la table ``bucket``
+
+        :param row: Ligne (key, b_limit, b_secs)
         :return: Bucket
         """
-        if key in self.cache_buckets and self.cache_buckets[key]["expires"] > int(
-            time.time()
-        ):
-            if self.cache_buckets[key]["bucket"].limit == 0:
-                raise ForbiddenException(
-                    headers={
-                        "X-RateLimit-Limit": 0,
-                        "X-RateLimit-Remaining": 0,
-                        "X-RateLimit-Reset": 0,
-                        "X-RateLimit-Bucket": "banned",
-                        "X-RateLimit-Used": 0,
-                    },
-                    extra={"ban": True},
-                )
-            else:
-                return self.cache_buckets[key]["bucket"]
+        if row["b_limit"] == 0:
+            return cls.BANNED
+        return Bucket(row["key"], row["b_limit"], row["b_secs"])
+
+    async def load(self) -> None:
+        """
+        Charge l'ensemble de la table ``bucket`` en mémoire
+        """
+        async with self._pool.acquire() as connection:
+            connection: Connection
+
+            rows = await connection.fetch(
+                "SELECT key, b_limit, b_secs FROM bucket", timeout=10
+            )
+
+        self.buckets = {row["key"]: self._to_bucket(row) for row in rows}
+        self.buckets_loaded = True
+
+    async def reload(self, key: str) -> None:
+        """
+        Recharge le bucket d'une clé
+
+        :param key: Clé de la requête (IP ou API Key)
+        """
+        async with self._pool.acquire() as connection:
+            connection: Connection
+
+            row = await connection.fetchrow(
+                "SELECT key, b_limit, b_secs FROM bucket WHERE key = $1", key, timeout=5
+            )
+
+        if row is None:
+            self.buckets.pop(key, None)
         else:
-            async with pool.acquire() as connection:
-                data = await connection.fetchrow(
-                    "SELECT key, b_limit, b_secs FROM bucket WHERE key = $1", key
-                )
+            self.buckets[key] = self._to_bucket(row)
 
-            if data is None:
-                self.cache_buckets[key] = {
-                    "expires": int(time.time()) + self.cache_refresh,
-                    "bucket": self.DEFAULT,
-                }
+    async def _on_bucket_changed(self, payload: str) -> None:
+        """
+        Applique une notification de modification de la table ``bucket``
 
-                return self.DEFAULT
+        :param payload: Clé modifiée, ou chaîne vide pour recharger toute la table
+        """
+        try:
+            if payload:
+                await self.reload(payload)
             else:
-                if data["b_limit"] == 0:
-                    self.cache_buckets[key] = {
-                        "expires": int(time.time()) + self.cache_refresh,
-                        "bucket": Bucket(ident="banned", limit=0, secs=0),
-                    }
-
-                    raise ForbiddenException(
-                        headers={
-                            "X-RateLimit-Limit": 0,
-                            "X-RateLimit-Remaining": 0,
-                            "X-RateLimit-Reset": 0,
-                            "X-RateLimit-Bucket": "banned",
-                            "X-RateLimit-Used": 0,
-                        },
-                        extra={"ban": True},
-                    )
-                else:
-                    bucket = Bucket(data["key"], data["b_limit"], data["b_secs"])
-                    self.cache_buckets[key] = {
-                        "expires": int(time.time()) + self.cache_refresh,
-                        "bucket": bucket,
-                    }
-
-                    return bucket
+                await self.load()
+        except Exception as e:
+            _LOGGER.warning("Impossible de recharger le bucket %r : %s", payload, e)
+
+    async def _refresh_loop(self) -> None:
+        """
+        Tâche de fond qui recharge la table ``bucket`` à intervalle régulier,
+        au cas où une notification aurait été manquée
+        """
+        while True:
+            try:
+                await asyncio.sleep(_RATELIMIT_BUCKETS_REFRESH)
+                await self.load()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                _LOGGER.warning("Impossible de recharger les buckets de rate limiting : %s", e)
+
+    def getBucket(self, key: str) -> Bucket:
+        """
+        Récupère le bucket d'une clé depuis la table ``bucket`` chargée en mémoire.
+        Aucune requête à la base de données n'est effectuée.
+
+        :param key: Clé de la requête (IP ou API Key)
+        :return: Bucket
+        :raises ForbiddenException: Si la clé est bannie
+        """
+        bucket = self.buckets.get(key, self.DEFAULT)
+
+        if bucket.limit == 0:
+            raise ForbiddenException(
+                headers={
+                    "X-RateLimit-Limit": 0,
+                    "X-RateLimit-Remaining": 0,
+                    "X-RateLimit-Reset": 0,
+                    "X-RateLimit-Bucket": "banned",
+                    "X-RateLimit-Used": 0,
+                },
+                extra={"ban": True},
+            )
+
+        return bucket
 
 
 def ratelimit(default_bucket: Bucket = Ratelimiter.DEFAULT) -> callable:
@@ -216,25 +422,15 @@ def ratelimit(default_bucket: Bucket = Ratelimiter.DEFAULT) -> callable:
 
             ratelimiter: Ratelimiter = request.app.ctx.ratelimiter
 
-            pool: Pool = getattr(request.app.ctx, "pool", None)
-            error = False
+            bucket: Bucket = ratelimiter.getBucket(key)
 
-            try:
-                if pool:
-                    bucket: Bucket = await ratelimiter.getBucket(pool, key)
-
-                    # Dans certains cas comme pour les images CDN, on veut appliquer la limite la moins restrictive
-                    if bucket.limit < default_bucket.limit:
-                        bucket = default_bucket
-                else:
-                    bucket = default_bucket
-            except ForbiddenException:
-                raise
-            except Exception:
-                # Si la récupération du bucket échoue (ex: DB indisponible), on replie sur le bucket par défaut
-                # afin que les headers X-RateLimit soient toujours présents dans la réponse
+            # Dans certains cas comme pour les images CDN, on veut appliquer la limite la moins restrictive
+            if bucket.limit < default_bucket.limit:
                 bucket = default_bucket
-                error = True
+
+            # Si la table des buckets n'a pas pu être chargée (ex: DB indisponible), le bucket par défaut
+            # est appliqué et signalé dans les headers
+            error = not ratelimiter.buckets_loaded
 
             headers = await ratelimiter.check_ratelimit(key, bucket, error=error)
 
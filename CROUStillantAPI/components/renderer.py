@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+
+from .generate import generate, preload
+from .cache import LocalCache
+from ..utils.image import saveImageToBuffer
+from ..utils.encoder import default
+from ..exceptions.unavailable import UnavailableException
+from sanic import Sanic
+from redis.exceptions import RedisError
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+from os import environ
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# Nombre de processus de rendu des images (0 : rendu dans le ThreadPoolExecutor de l'application)
+_RENDER_PROCESSES = int(environ.get("RENDER_PROCESSES", 0))
+# Nombre maximal de rendus en cours ou en attente par worker, au-delà : 503
+_RENDER_MAX_PENDING = int(environ.get("RENDER_MAX_PENDING", 32))
+_RETRY_AFTER = 5  # secondes
+
+# Cache des images rendues, indexé par le contenu des tâches (et non par l'URL)
+_RENDER_CACHE_TTL = int(environ.get("RENDER_CACHE_TTL", 60 * 60 * 24))
+_RENDER_CACHE_MAX_BYTES = int(environ.get("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+_RENDER_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+_RENDER_CACHE_PREFIX = "render:"
+
+# Champs d'un restaurant lus par generate, seuls transmis aux processus de rendu
+_RESTAURANT_FIELDS = (
+    "nom",
+    "opened",
+    "horaires",
+    "email",
+    "telephone",
+    "paiement",
+    "zone",
+    "adresse",
+    "pmr",
+    "acces",
+)
+
+
+def _init_worker() -> None:
+    """
+    Initialise un processus de rendu en préchargeant les polices et les images
+    """
+    try:
+        preload()
+    except OSError as e:
+        _LOGGER.warning("Impossible de précharger les ressources des images : %s", e)
+
+
+def render_key(job: dict) -> str:
+    """
+    Calcule la clé de cache d'une tâche de rendu à partir de son contenu normalisé :
+    deux tâches produisant la même image partagent la même clé, quelle que soit l'URL.
+
+    :param job: Tâche construite par :meth:`Renderer.job`
+    :return: La clé de cache
+    """
+    preview = job["preview"]
+    content = {
+        **job,
+        "preview": hashlib.blake2b(preview, digest_size=16).hexdigest() if preview else None,
+    }
+    raw_key = json.dumps(content, sort_keys=True, ensure_ascii=False, default=default)
+    return _RENDER_CACHE_PREFIX + hashlib.blake2b(raw_key.encode(), digest_size=16).hexdigest()
+
+
+def render(job: dict) -> bytes:
+    """
+    Génère l'image d'un menu
+
+    :param job: Tâche construite par :meth:`Renderer.job`
+    :return: L'image encodée
+    """
+    image = generate(
+        restaurant=job["restaurant"],
+        menu=job["menu"],
+        date=job["date"],
+        preview=job["preview"],
+        theme=job["theme"],
+        custom_colours=job["custom_colours"],
+    )
+    return saveImageToBuffer(
+        image, compression_level=1, format=job["format"], width=job["width"]
+    ).getvalue()
+
+
+class Renderer:
+    """
+    Classe pour le rendu des images des menus.
+
+    Avec ``RENDER_PROCESSES`` > 0, les rendus sont exécutés par un ``ProcessPoolExecutor``
+    dont les processus préchargent les polices et les images à leur démarrage : la mise en
+    page du texte par Pillow ne libère pas le GIL, si bien que des rendus dans des threads
+    s'exécutent les uns après les autres. Sinon, ils sont exécutés dans le
+    ``ThreadPoolExecutor`` de l'application. Chaque worker Sanic démarre son propre pool :
+    le nombre total de processus de rendu est ``workers × RENDER_PROCESSES``.
+
+    Les tâches sont des dictionnaires compacts et le résultat est l'image encodée (PNG, WebP
+    ou JPEG). Au-delà de ``RENDER_MAX_PENDING`` rendus en cours ou en attente, les nouvelles
+    demandes sont refusées avec une :class:`UnavailableException` (503 et ``Retry-After``).
+
+    Les images rendues sont conservées ``RENDER_CACHE_TTL`` secondes, dans un cache local
+    borné à ``RENDER_CACHE_MAX_BYTES`` octets puis dans Redis, sous une clé calculée à partir
+    du contenu de la tâche (:func:`render_key`) : un menu inchangé n'est rendu qu'une fois,
+    et des demandes simultanées d'une même image ne déclenchent qu'un seul rendu.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self.app = app
+        self.pool: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.local = LocalCache(_RENDER_CACHE_MAX_BYTES, _RENDER_CACHE_MAX_ENTRY_BYTES)
+
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        @app.before_server_start
+        async def start_renderer(app):
+            """
+            Démarre les processus de rendu
+
+            :param app: Instance de l'application Sanic
+            """
+            if _RENDER_PROCESSES <= 0:
+                return
+
+            self._start_pool()
+
+            # Démarre tous les processus maintenant plutôt qu'au premier rendu
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *(loop.run_in_executor(self.pool, int) for _ in range(_RENDER_PROCESSES))
+            )
+
+            app.ctx.logs.debug(f"Utilisation de {_RENDER_PROCESSES} processus pour le rendu des images.")
+
+        @app.after_server_stop
+        async def stop_renderer(app):
+            """
+            Arrête les processus de rendu
+
+            :param app: Instance de l'application Sanic
+            """
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _start_pool(self) -> None:
+        """
+        Crée le ``ProcessPoolExecutor`` des rendus
+        """
+        self.pool = ProcessPoolExecutor(
+            max_workers=_RENDER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    @staticmethod
+    def job(
+        restaurant,
+        menu: dict | None,
+        date,
+        preview: bytes | None,
+        theme: str,
+        custom_colours: dict | None,
+        format: str = "png",
+        width: int | None = None,
+    ) -> dict:
+        """
+        Construit une tâche de rendu sérialisable
+
+        :param restaurant: Entrée du catalogue
+        :param menu: Repas à afficher
+        :param date: Date du menu
+        :param preview: Image du restaurant
+        :param theme: Thème de l'image
+        :param custom_colours: Couleurs personnalisées
+        :param format: Format de sortie (``png``, ``webp`` ou ``jpeg``)
+        :param width: Largeur de l'image réduite (facultatif)
+        :return: La tâche
+        """
+        return {
+            "restaurant": {field: restaurant.get(field) for field in _RESTAURANT_FIELDS},
+            "menu": menu,
+            "date": date,
+            "preview": preview,
+            "theme": theme,
+            "custom_colours": custom_colours,
+            "format": format,
+            "width": width,
+        }
+
+    async def render(self, job: dict) -> bytes:
+        """
+        Retourne l'image d'un menu, depuis le cache des rendus ou en la générant
+
+        :param job: Tâche construite par :meth:`job`
+        :return: L'image encodée
+        :raises UnavailableException: Si trop de rendus sont déjà en cours
+        """
+        key = render_key(job)
+
+        content = await self.fetch(key)
+        if content is not None:
+            return content
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._render(key, job))
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Le rendu se poursuit (et est mis en cache) même si la requête est annulée
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        """
+        Retire un rendu terminé des rendus en cours
+
+        :param key: Clé retournée par :func:`render_key`
+        :param task: Rendu terminé
+        """
+        self._inflight.pop(key, None)
+
+        # Évite l'avertissement « exception never retrieved » si toutes les requêtes ont été annulées
+        if not task.cancelled():
+            task.exception()
+
+    async def fetch(self, key: str) -> bytes | None:
+        """
+        Récupère une image rendue, d'abord dans le cache local puis dans Redis
+
+        :param key: Clé retournée par :func:`render_key`
+        :return: L'image encodée ou None
+        """
+        content = self.local.get(key)
+        if content is not None:
+            return content
+
+        redis = self.app.ctx.cache.redis
+        if not redis:
+            return None
+
+        try:
+            content = await redis.get(key)
+        except (RedisError, OSError) as e:
+            _LOGGER.warning("Lecture du cache des rendus impossible : %s", e)
+            return None
+
+        if content is not None:
+            self.local.set(key, content, _RENDER_CACHE_TTL)
+
+        return content
+
+    async def contains(self, key: str) -> bool:
+        """
+        Indique si une image rendue est en cache, sans la transférer depuis Redis
+
+        :param key: Clé retournée par :func:`render_key`
+        :return: True si l'image est en cache
+        """
+        if self.local.get(key) is not None:
+            return True
+
+        redis = self.app.ctx.cache.redis
+        if not redis:
+            return False
+
+        try:
+            return bool(await redis.exists(key))
+        except (RedisError, OSError):
+            return False
+
+    async def store(self, key: str, content: bytes) -> None:
+        """
+        Stocke une image rendue dans le cache local et dans Redis
+
+        :param key: Clé retournée par :func:`render_key`
+        :param content: L'image encodée
+        """
+        self.local.set(key, content, _RENDER_CACHE_TTL)
+
+        redis = self.app.ctx.cache.redis
+        if not redis:
+            return
+
+        try:
+            await redis.set(key, content, ex=_RENDER_CACHE_TTL)
+        except (RedisError, OSError) as e:
+            _LOGGER.warning("Écriture dans le cache des rendus impossible : %s", e)
+
+    async def _render(self, key: str, job: dict) -> bytes:
+        """
+        Génère l'image d'un menu dans le pool de rendu, puis la met en cache
+
+        :param key: Clé retournée par :func:`render_key`
+        :param job: Tâche construite par :meth:`job`
+        :return: L'image encodée
+        :raises UnavailableException: Si trop de rendus sont déjà en cours
+        """
+        if self.pending >= _RENDER_MAX_PENDING:
+            raise UnavailableException(
+                headers={"Retry-After": str(_RETRY_AFTER)},
+                extra={"retry_after": _RETRY_AFTER},
+            )
+
+        pool = self.pool
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(pool or self.app.ctx.executor, render, job)
+        except BrokenProcessPool:
+            # Un processus de rendu s'est arrêté brutalement : le pool est inutilisable
+            if self.pool is pool:
+                _LOGGER.warning("Pool de rendu des images interrompu, redémarrage")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._start_pool()
+            raise
+        finally:
+            self.pending -= 1
+
+        await self.store(key, content)
+        return content
@@ -1,5 +1,6 @@
+from ..utils.encoder import dumps
 from sanic.request import Request
-from sanic.response import JSONResponse, json
+from sanic.response import HTTPResponse, JSONResponse, json, raw
 
 
 class Response:
@@ -25,6 +26,10 @@ class Response:
 class JSON(Response):
     """
     Classe pour les réponses JSON
+
+    Le corps est encodé directement en bytes par l'encodeur de ``JSON_ENCODER``
+    (orjson s'il est installé), les dates et datetimes étant formatées en
+    ``DD-MM-YYYY`` et ``DD-MM-YYYY HH:MM:SS``.
     """
 
     def __init__(
@@ -63,11 +68,56 @@ class JSON(Response):
                     "message": "Quelque chose s'est mal passé... Veuillez réessayer plus tard. Si le problème persiste, contactez nous !",
                 },
                 status=500,
+                dumps=dumps,
             )
 
         if self.message:
             return json(
-                {"success": self.success, "message": self.message}, status=self.status
+                {"success": self.success, "message": self.message},
+                status=self.status,
+                dumps=dumps,
             )
 
-        return json({"success": self.success, "data": self.data}, status=self.status)
+        return json(
+            {"success": self.success, "data": self.data}, status=self.status, dumps=dumps
+        )
+
+
+class JSONFragments(Response):
+    """
+    Classe pour les réponses JSON assemblées à partir de fragments déjà encodés
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        data: bytes | list[bytes],
+        status: int = 200,
+    ) -> None:
+        """
+        Initialisation de la classe
+
+        :param request: Request
+        :param data: Fragment JSON encodé, ou liste de fragments à assembler en tableau
+        :param status: int
+        """
+        super().__init__(request)
+        self.data = data
+        self.status = status
+
+    def generate(self) -> HTTPResponse:
+        """
+        Génère la réponse par simple concaténation des fragments
+
+        :return: HTTPResponse
+        """
+        if isinstance(self.data, list):
+            data = b"[" + b",".join(self.data) + b"]"
+        else:
+            data = self.data
+
+        return raw(
+            b'{"success":true,"data":' + data + b"}",
+            content_type="application/json",
+            status=self.status,
+        )
@@ -2,6 +2,15 @@ import re
 from datetime import datetime
 
 
+# Champs sélectionnables avec le paramètre ``fields``
+RESTAURANT_FIELDS = frozenset((
+    "code", "region", "type", "nom", "adresse", "latitude", "longitude", "horaires",
+    "jours_ouvert", "image_url", "email", "telephone", "ispmr", "zone", "paiement",
+    "acces", "ouvert", "actif",
+))
+MENU_FIELDS = frozenset(("code", "date", "repas"))
+
+
 class Rules:
     @staticmethod
     def boolean(arg: str) -> bool:
@@ -125,6 +134,40 @@ class Rules:
         parts = [m.strip() for m in arg.split(",") if m.strip()]
         return len(parts) > 0 and len(parts) == len(set(parts)) and all(m in _allowed for m in parts)
 
+    @staticmethod
+    def restaurant_fields(arg: str) -> bool:
+        """
+        Les champs doivent être une liste séparée par des virgules.
+        Valeurs autorisées : code, region, type, nom, adresse, latitude, longitude, horaires, jours_ouvert, image_url, email, telephone, ispmr, zone, paiement, acces, ouvert, actif.
+        Au moins un champ doit être présent.
+        """
+        parts = [f.strip() for f in arg.split(",") if f.strip()]
+        return len(parts) > 0 and all(f in RESTAURANT_FIELDS for f in parts)
+
+    @staticmethod
+    def menu_fields(arg: str) -> bool:
+        """
+        Les champs doivent être une liste séparée par des virgules.
+        Valeurs autorisées : code, date, repas.
+        Au moins un champ doit être présent.
+        """
+        parts = [f.strip() for f in arg.split(",") if f.strip()]
+        return len(parts) > 0 and all(f in MENU_FIELDS for f in parts)
+
+    @staticmethod
+    def image_format(arg: str) -> bool:
+        """
+        Le format doit être 'png', 'webp' ou 'jpeg'.
+        """
+        return arg.lower() in ("png", "webp", "jpeg")
+
+    @staticmethod
+    def image_width(arg: str | int) -> bool:
+        """
+        La largeur doit être l'une des valeurs suivantes (en pixels) : 480, 960, 1280, 1920.
+        """
+        return str(arg) in ("480", "960", "1280", "1920")
+
     @staticmethod
     def hex_color(arg: str) -> bool:
         """
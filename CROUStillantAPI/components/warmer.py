@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import time
+
+from sanic import Sanic
+from redis.exceptions import RedisError
+from dotenv import load_dotenv
+from os import environ
+from datetime import datetime
+from pytz import timezone
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+load_dotenv(dotenv_path=".env")
+
+
+# Nombre de routes calculées simultanément, pour ne pas monopoliser le pool PostgreSQL
+_CACHE_WARMER_CONCURRENCY = int(environ.get("CACHE_WARMER_CONCURRENCY", 4))
+_WARMUP_LOCK_TTL = 60 * 10  # secondes, un seul worker du cluster préchauffe par exécution
+
+
+class CacheWarmer:
+    """
+    Classe pour préchauffer le cache des routes les plus consultées.
+
+    Au démarrage et après chaque tâche d'ingestion (une fois le cache invalidé), les entrées
+    absentes ou périmées du statut des restaurants, ainsi que du détail, du menu et de
+    l'image du menu de midi du jour de chaque restaurant actif sont recalculées en
+    arrière-plan, avec au plus ``CACHE_WARMER_CONCURRENCY`` routes en parallèle.
+    """
+
+    def __init__(self, app: Sanic) -> None:
+        """
+        Initialise la classe et enregistre les listeners Sanic
+
+        :param app: Instance de l'application Sanic
+        """
+        self.app = app
+
+        self._semaphore = asyncio.Semaphore(_CACHE_WARMER_CONCURRENCY)
+        self._task: asyncio.Task | None = None
+        self._queued: str | None = None
+
+        app.ctx.ingestion.subscribe(self._on_ingestion, priority=10)
+
+        @app.after_server_start
+        async def start_warmer(app):
+            """
+            Préchauffe le cache après le démarrage du serveur (ex : après un redémarrage de Redis)
+
+            :param app: Instance de l'application Sanic
+            """
+            if not app.debug:
+                self.schedule(f"startup:{int(time.time()) // _WARMUP_LOCK_TTL}")
+
+        @app.before_server_stop
+        async def stop_warmer(app):
+            """
+            Annule le préchauffage en cours avant l'arrêt du serveur
+
+            :param app: Instance de l'application Sanic
+            """
+            if self._task is not None and not self._task.done():
+                self._task.cancel()
+
+    def schedule(self, run: str) -> None:
+        """
+        Planifie un préchauffage en arrière-plan. Si un préchauffage est déjà en cours,
+        le suivant est lancé à sa fin.
+
+        :param run: Identifiant de l'exécution, partagé par les workers du cluster
+        """
+        if self._task is not None and not self._task.done():
+            self._queued = run
+            return
+
+        self._task = asyncio.create_task(self._run(run))
+
+    async def _on_ingestion(self, ingestion) -> None:
+        """
+        Préchauffe le cache après une tâche d'ingestion
+
+        :param ingestion: Ingestion terminée
+        """
+        if not self.app.debug:
+            self.schedule(f"ingestion:{ingestion.id}")
+
+    async def _run(self, run: str) -> None:
+        """
+        Exécute les préchauffages planifiés les uns après les autres
+
+        :param run: Identifiant de la première exécution
+        """
+        while run is not None:
+            try:
+                await self.warm(run)
+            except Exception as e:
+                _LOGGER.warning("Préchauffage du cache %s échoué : %s", run, e)
+
+            run, self._queued = self._queued, None
+
+    async def warm(self, run: str) -> int:
+        """
+        Préchauffe le cache des routes les plus consultées pour tous les restaurants actifs
+
+        :param run: Identifiant de l'exécution, partagé par les workers du cluster
+        :return: Nombre d'entrées recalculées
+        """
+        cache = self.app.ctx.cache
+        if not cache.redis:
+            return 0
+
+        try:
+            acquired = await cache.redis.set(
+                f"lock:warmup:{run}", os.getpid(), nx=True, ex=_WARMUP_LOCK_TTL
+            )
+        except RedisError:
+            return 0
+
+        if not acquired:
+            return 0  # Un autre worker s'en charge
+
+        today = datetime.now(tz=timezone("Europe/Paris")).strftime("%d-%m-%Y")
+        date = datetime.strptime(today, "%d-%m-%Y")
+
+        jobs = [("getRestaurantsStatus", {}, {})]
+        catalog = await self.app.ctx.catalog.get()
+        for restaurant in catalog.active:
+            rid = restaurant.get("rid")
+            jobs.append(("getRestaurant", {"code": rid}, {"code": rid}))
+            jobs.append(("getRestaurantMenu", {"code": rid}, {"code": rid}))
+            jobs.append(
+                (
+                    "getRestaurantMenuFromDateImage",
+                    {"code": rid, "date": today},
+                    {"code": rid, "date": date},
+                )
+            )
+
+        results = await asyncio.gather(
+            *(self._warm(name, params, kwargs) for name, params, kwargs in jobs)
+        )
+        warmed = sum(results)
+
+        _LOGGER.info("Préchauffage du cache %s : %d/%d entrées recalculées", run, warmed, len(jobs))
+
+        return warmed
+
+    async def _warm(self, name: str, params: dict, kwargs: dict) -> bool:
+        """
+        Préchauffe l'entrée d'une route
+
+        :param name: Nom du handler de la route
+        :param params: Paramètres du chemin de la route
+        :param kwargs: Paramètres passés au handler
+        :return: True si l'entrée a été recalculée
+        """
+        async with self._semaphore:
+            try:
+                path = self.app.url_for(f"Restaurants.{name}", **params)
+                return await self.app.ctx.cache.warm(name, path, **kwargs)
+            except Exception as e:
+                _LOGGER.debug("Préchauffage de %s %s échoué : %s", name, params, e)
+                return False
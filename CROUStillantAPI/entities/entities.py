@@ -6,6 +6,7 @@ from .plats import Plats
 from .menus import Menus
 from .taches import Taches
 from .insights import Insights
+from .usage import Usage
 from asyncpg import Pool
 
 
@@ -21,3 +22,4 @@ class Entities:
         self.menus = Menus(pool)
         self.taches = Taches(pool)
         self.insights = Insights(pool)
+        self.usage = Usage(pool)
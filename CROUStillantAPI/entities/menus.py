@@ -128,6 +128,86 @@ class Menus:
                 timeout=8,
             )
 
+    async def getCurrentSummary(self, id: int, date: datetime) -> dict:
+        """
+        Récupère l'ID et la date des menus d'un restaurant, sans leurs repas.
+        Retourne les mêmes menus que ``getCurrent``.
+
+        :param id: ID du restaurant
+        :param date: Date du menu
+        :return: Les menus
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await _fetch(
+                connection,
+                """
+                    WITH LatestMenus AS (
+                        SELECT DISTINCT ON (M.DATE)
+                            M.MID,
+                            M.DATE
+                        FROM PUBLIC.MENU M
+                        WHERE M.RID = $1
+                        AND M.DATE >= $2
+                        ORDER BY M.DATE, M.MID DESC
+                    )
+
+                    SELECT
+                        LM.MID,
+                        LM.DATE
+                    FROM LatestMenus LM
+                    WHERE EXISTS (
+                        SELECT 1
+                        FROM PUBLIC.REPAS RP
+                        JOIN PUBLIC.CATEGORIE C ON RP.RPID = C.RPID
+                        WHERE RP.MID = LM.MID
+                    )
+                    ORDER BY LM.DATE
+                """,
+                id,
+                date,
+                timeout=5,
+            )
+
+    async def getSummaryFromDate(self, id: int, date: datetime) -> dict:
+        """
+        Récupère l'ID et la date du menu d'un restaurant, sans ses repas.
+        Retourne le même menu que ``getFromDate``.
+
+        :param id: ID du restaurant
+        :param date: Date du menu
+        :return: Le menu
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await _fetch(
+                connection,
+                """
+                    WITH LatestMenu AS (
+                        SELECT MAX(MID) AS MID
+                        FROM PUBLIC.MENU
+                        WHERE RID = $1 AND DATE = $2
+                    )
+
+                    SELECT
+                        M.MID,
+                        M.DATE
+                    FROM PUBLIC.MENU M
+                    JOIN LatestMenu LM ON M.MID = LM.MID
+                    WHERE EXISTS (
+                        SELECT 1
+                        FROM PUBLIC.REPAS RP
+                        JOIN PUBLIC.CATEGORIE C ON RP.RPID = C.RPID
+                        WHERE RP.MID = M.MID
+                    )
+                """,
+                id,
+                date,
+                timeout=5,
+            )
+
     async def getDates(self, id: int) -> dict:
         """
         Récupère les dates des prochains menus d'un restaurant.
@@ -82,6 +82,51 @@ class Restaurants:
                 timeout=10,
             )
 
+    async def getCatalog(self) -> list:
+        """
+        Récupère tous les restaurants, actifs ou non, pour le catalogue en mémoire.
+
+        :return: Les restaurants, triés par ID
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await connection.fetch(
+                """
+                    SELECT
+                        RID,
+                        R.IDREG AS IDREG,
+                        R.LIBELLE AS REGION,
+                        TPR.IDTPR AS IDTPR,
+                        TPR.LIBELLE AS TYPE,
+                        NOM,
+                        ADRESSE,
+                        LATITUDE,
+                        LONGITUDE,
+                        HORAIRES::jsonb AS HORAIRES,
+                        JOURS_OUVERT,
+                        CASE
+                            WHEN IMAGE_URL IS NULL THEN NULL
+                            ELSE CONCAT('https://api.croustillant.menu/v1/restaurants/', RID, '/preview')
+                        END AS IMAGE_URL,
+                        EMAIL,
+                        TELEPHONE,
+                        ISPMR,
+                        ZONE,
+                        (PAIEMENT::jsonb - 'Carte bancaire') AS PAIEMENT,
+                        ACCES::jsonb AS ACCES,
+                        OPENED,
+                        ACTIF
+                    FROM
+                        restaurant
+                    JOIN region R ON restaurant.idreg = R.idreg
+                    JOIN type_restaurant TPR ON restaurant.idtpr = TPR.idtpr
+                    ORDER BY
+                        RID
+                """,
+                timeout=10,
+            )
+
     async def getStatus(self, ouvert: bool | None = None) -> list:
         """
         Récupère le statut d'ouverture de tous les restaurants actifs.
@@ -127,3 +127,52 @@ class Taches:
                 limit,
                 timeout=10,
             )
+
+    async def getLastFinishedId(self) -> int | None:
+        """
+        Récupère l'ID de la dernière tâche d'ingestion terminée.
+
+        :return: L'ID de la tâche, ou None s'il n'y en a aucune
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await connection.fetchval(
+                """
+                    SELECT
+                        MAX(id)
+                    FROM
+                        tache
+                    WHERE
+                        fin IS NOT NULL
+                """,
+                timeout=5,
+            )
+
+    async def getTouchedRestaurants(self, after: int, until: int) -> list:
+        """
+        Récupère les restaurants vérifiés par les tâches d'ingestion d'un intervalle.
+
+        :param after: ID de la dernière tâche déjà traitée (exclue)
+        :param until: ID de la dernière tâche à traiter (incluse)
+        :return: Les restaurants (rid, idreg) touchés par ces tâches
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await connection.fetch(
+                """
+                    SELECT DISTINCT
+                        R.rid,
+                        R.idreg
+                    FROM
+                        tache_log TL
+                    JOIN restaurant R ON TL.rid = R.rid
+                    WHERE
+                        TL.idtache > $1
+                        AND TL.idtache <= $2
+                """,
+                after,
+                until,
+                timeout=10,
+            )
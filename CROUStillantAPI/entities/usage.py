@@ -0,0 +1,77 @@
+from asyncpg import Pool, Connection
+
+
+class Usage:
+    def __init__(self, pool: Pool) -> None:
+        self.pool = pool
+
+    async def getForKey(self, key: str, days: int) -> list:
+        """
+        Récupère l'utilisation d'une clé API par jour et par route, depuis les agrégats de la table ``requests_rollups``.
+
+        :param key: Clé API
+        :param days: Nombre de jours (y compris aujourd'hui)
+        :return: Les agrégats (jour, route, requetes, erreurs, latence) triés par jour puis par route
+        """
+        async with self.pool.acquire() as connection:
+            connection: Connection
+
+            return await connection.fetch(
+                """
+                    WITH rollups AS (
+                        SELECT
+                            (minute AT TIME ZONE 'Europe/Paris')::DATE AS jour,
+                            route,
+                            status,
+                            count,
+                            latency
+                        FROM
+                            requests_rollups
+                        WHERE
+                            key = $1
+                            AND minute >= DATE_TRUNC('day', NOW() AT TIME ZONE 'Europe/Paris') AT TIME ZONE 'Europe/Paris' - ($2 - 1) * INTERVAL '1 day'
+                    ),
+                    histogrammes AS (
+                        SELECT
+                            jour,
+                            route,
+                            ARRAY_AGG(total ORDER BY i) AS latence
+                        FROM (
+                            SELECT
+                                R.jour,
+                                R.route,
+                                H.i,
+                                SUM(H.n)::INTEGER AS total
+                            FROM
+                                rollups R,
+                                UNNEST(R.latency) WITH ORDINALITY AS H(n, i)
+                            GROUP BY
+                                R.jour,
+                                R.route,
+                                H.i
+                        ) T
+                        GROUP BY
+                            jour,
+                            route
+                    )
+                    SELECT
+                        R.jour,
+                        R.route,
+                        SUM(R.count)::INTEGER AS requetes,
+                        COALESCE(SUM(R.count) FILTER (WHERE R.status >= 400), 0)::INTEGER AS erreurs,
+                        H.latence
+                    FROM
+                        rollups R
+                    JOIN histogrammes H ON H.jour = R.jour AND H.route = R.route
+                    GROUP BY
+                        R.jour,
+                        R.route,
+                        H.latence
+                    ORDER BY
+                        R.jour,
+                        R.route
+                """,
+                key,
+                days,
+                timeout=10,
+            )
@@ -0,0 +1,10 @@
+from sanic.exceptions import SanicException
+
+
+class UnavailableException(SanicException):
+    status_code = 503
+    quiet = True
+
+    @property
+    def message(self):
+        return f"Le service est temporairement surchargé. Veuillez réessayer dans {self.extra['retry_after']} secondes."
@@ -2,6 +2,7 @@ from .ratelimited import RateLimited
 from .badrequest import BadRequest
 from .notfound import NotFound
 from .unauthorized import Unauthorized
+from .unavailable import Unavailable
 
 
-__all__ = ["RateLimited", "BadRequest", "NotFound", "Unauthorized"]
+__all__ = ["RateLimited", "BadRequest", "NotFound", "Unauthorized", "Unavailable"]
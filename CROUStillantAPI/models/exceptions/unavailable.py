@@ -0,0 +1,12 @@
+from sanic_ext import openapi
+
+
+class Unavailable:
+    success = openapi.Boolean(
+        description="Statut de la requête",
+        example=False,
+    )
+    message = openapi.String(
+        description="Message de retour",
+        example="Le service est temporairement surchargé. Veuillez réessayer dans 5 secondes.",
+    )
@@ -0,0 +1,79 @@
+from sanic_ext import openapi
+
+
+class BucketUsage:
+    limite = openapi.Integer(
+        description="Nombre de requêtes autorisées par période",
+        example=1000,
+    )
+    periode = openapi.Integer(
+        description="Durée de la période de rate limiting, en secondes",
+        example=60,
+    )
+
+
+class Periode:
+    debut = openapi.String(
+        description="Premier jour de la période (DD-MM-YYYY)",
+        example="05-07-2026",
+    )
+    fin = openapi.String(
+        description="Dernier jour de la période (DD-MM-YYYY)",
+        example="11-07-2026",
+    )
+
+
+class Total:
+    requetes = openapi.Integer(
+        description="Nombre de requêtes",
+        example=12500,
+    )
+    erreurs = openapi.Integer(
+        description="Nombre de requêtes en erreur (statut >= 400)",
+        example=25,
+    )
+    taux_erreur = openapi.Float(
+        description="Taux d'erreur en pourcentage",
+        example=0.2,
+    )
+    p95 = openapi.Integer(
+        description="95e percentile du temps de traitement, en ms (borne supérieure de l'intervalle de l'histogramme)",
+        example=50,
+        nullable=True,
+    )
+
+
+class Jour(Total):
+    date = openapi.String(
+        description="Jour (DD-MM-YYYY)",
+        example="11-07-2026",
+    )
+
+
+class Route(Total):
+    route = openapi.String(
+        description="Modèle de la route",
+        example="/v1/restaurants/<code>/menu",
+    )
+
+
+class Data:
+    bucket = BucketUsage
+    periode = Periode
+    total = Total
+    jours = openapi.Array(
+        items=Jour,
+        description="Utilisation par jour, du plus ancien au plus récent",
+    )
+    routes = openapi.Array(
+        items=Route,
+        description="Utilisation par route, les plus sollicitées en premier",
+    )
+
+
+class Usage:
+    success = openapi.Boolean(
+        description="Statut de la requête",
+        example=True,
+    )
+    data = Data
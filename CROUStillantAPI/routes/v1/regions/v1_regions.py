@@ -1,11 +1,10 @@
 from ....components.ratelimit import ratelimit
 from ....components.cache import cache
-from ....components.response import JSON
+from ....components.response import JSON, JSONFragments
 from ....components.argument import Argument, inputs
 from ....components.rules import Rules
 from ....models.responses import Regions, Region, Restaurants, GeoJSON
 from ....models.exceptions import RateLimited, BadRequest, NotFound
-from ....utils.opening import Opening
 from sanic.response import HTTPResponse, JSONResponse, file
 from sanic import Blueprint, Request
 from sanic_ext import openapi
@@ -32,14 +31,19 @@ bp = Blueprint(name="Regions", url_prefix="/regions", version=1, version_prefix=
     description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurants",),
+)
 async def getRegions(request: Request) -> JSONResponse:
     """
     Récupère les régions
 
     :return: Les régions
     """
-    regions = await request.app.ctx.entities.regions.getAll()
+    regions = (await request.app.ctx.catalog.get()).regions.values()
 
     return JSON(
         request=request,
@@ -134,7 +138,12 @@ async def getRegionsGeoJSON(request: Request) -> HTTPResponse:
     )
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("region:{code}",),
+)
 async def getRegion(request: Request, code: int) -> JSONResponse:
     """
     Retourne les détails d'une région.
@@ -142,7 +151,7 @@ async def getRegion(request: Request, code: int) -> JSONResponse:
     :param code: ID de la région
     :return: La région
     """
-    region = await request.app.ctx.entities.regions.getOne(code)
+    region = (await request.app.ctx.catalog.get()).regions.get(code)
 
     if region is None:
         return JSON(
@@ -211,16 +220,21 @@ async def getRegion(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("region:{code}",),
+)
 async def getRegionRestaurants(request: Request, code: int) -> JSONResponse:
     """
     Récupère les restaurants
 
     :return: Les restaurants
     """
-    region = await request.app.ctx.entities.regions.getOne(code)
+    catalog = await request.app.ctx.catalog.get()
 
-    if region is None:
+    if code not in catalog.regions:
         return JSON(
             request=request,
             success=False,
@@ -228,38 +242,10 @@ async def getRegionRestaurants(request: Request, code: int) -> JSONResponse:
             message="La région n'existe pas.",
         ).generate()
 
-    restaurants = await request.app.ctx.entities.regions.getRestaurants(code)
+    restaurants = catalog.filter(region=code)
 
-    return JSON(
+    return JSONFragments(
         request=request,
-        success=True,
-        data=[
-            {
-                "code": restaurant.get("rid"),
-                "region": {
-                    "code": restaurant.get("idreg"),
-                    "libelle": restaurant.get("region"),
-                },
-                "type": {
-                    "code": restaurant.get("idtpr"),
-                    "libelle": restaurant.get("type"),
-                },
-                "nom": restaurant.get("nom"),
-                "adresse": restaurant.get("adresse"),
-                "latitude": restaurant.get("latitude"),
-                "longitude": restaurant.get("longitude"),
-                "horaires": restaurant.get("horaires"),
-                "jours_ouvert": Opening(restaurant.get("jours_ouvert")).get(),
-                "image_url": restaurant.get("image_url"),
-                "email": restaurant.get("email"),
-                "telephone": restaurant.get("telephone"),
-                "ispmr": restaurant.get("ispmr"),
-                "zone": restaurant.get("zone"),
-                "paiement": restaurant.get("paiement"),
-                "acces": restaurant.get("acces"),
-                "ouvert": restaurant.get("opened"),
-            }
-            for restaurant in restaurants
-        ],
+        data=[catalog.fragments[restaurant["rid"]].region for restaurant in restaurants],
         status=200,
     ).generate()
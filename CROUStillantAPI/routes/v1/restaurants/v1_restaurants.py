@@ -1,7 +1,6 @@
 from ....components.ratelimit import ratelimit, Bucket
 from ....components.cache import cache
-from ....components.generate import generate
-from ....components.response import JSON
+from ....components.response import JSON, JSONFragments
 from ....components.argument import Argument, inputs
 from ....components.rules import Rules
 from ....models.responses import (
@@ -18,14 +17,14 @@ from ....models.responses import (
     RestaurantInsights,
     RestaurantActivity,
 )
-from ....models.exceptions import RateLimited, BadRequest, NotFound
-from ....utils.opening import Opening
-from ....utils.image import saveImageToBuffer
-from ....utils.format import getBoolFromString, getIntFromString
+from ....models.exceptions import RateLimited, BadRequest, NotFound, Unavailable
+from ....utils.image import IMAGE_FORMATS, negotiate_image_format, negotiates_image_format
+from ....utils.format import getBoolFromString, getIntFromString, getFieldsFromString
 from ....utils.colors import parse_custom_colours
 from ....utils.iframes import restaurantMenuIframe, restaurantCustomIframe
-from ....utils.menu import build_menu_structure
+from ....utils.menu import build_menu_structure, project_menu, select_repas
 from ....exceptions.error import ServerErrorException
+from ....exceptions.unavailable import UnavailableException
 from sanic.response import HTTPResponse, JSONResponse, raw
 from sanic import Blueprint, Request
 from sanic.log import logger
@@ -33,7 +32,7 @@ from sanic_ext import openapi
 from json import loads
 from datetime import datetime, timedelta, date as date_cls
 from pytz import timezone
-from asyncio import get_event_loop, gather
+from asyncio import gather
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 
@@ -112,12 +111,40 @@ jinja_env = Environment(
     location="query",
     example="Pau",
 )
+@openapi.parameter(
+    name="fields",
+    description="Champs à inclure dans la réponse, séparés par des virgules (voir le modèle Restaurant)",
+    required=False,
+    schema=str,
+    location="query",
+    example="code,nom,ouvert",
+)
+@inputs(
+    Argument(
+        name="fields",
+        description="Champs à inclure dans la réponse",
+        methods={"fields": Rules.restaurant_fields},
+        call=getFieldsFromString,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    )
+)
 @ratelimit()
-@cache(ttl=300)
-async def getRestaurants(request: Request) -> JSONResponse:
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurants",),
+)
+async def getRestaurants(
+    request: Request, fields: tuple[str, ...] | None = None
+) -> JSONResponse:
     """
     Récupère les restaurants
 
+    :param fields: Champs à inclure dans la réponse (tous par défaut)
     :return: Les restaurants
     """
     ouvert_param = request.args.get("ouvert", None)
@@ -126,7 +153,8 @@ async def getRestaurants(request: Request) -> JSONResponse:
     type_param = request.args.get("type", None)
     zone_param = request.args.get("zone", None)
 
-    restaurants = await request.app.ctx.entities.restaurants.getAll(
+    catalog = await request.app.ctx.catalog.get()
+    restaurants = catalog.filter(
         actif=getBoolFromString(request.args.get("actif", True)),
         ouvert=getBoolFromString(ouvert_param) if ouvert_param is not None else None,
         ispmr=getBoolFromString(ispmr_param) if ispmr_param is not None else None,
@@ -135,42 +163,12 @@ async def getRestaurants(request: Request) -> JSONResponse:
         zone=zone_param,
     )
 
-    return JSON(
+    return JSONFragments(
         request=request,
-        success=True,
         data=[
-            {
-                "code": restaurant.get("rid"),
-                "region": {
-                    "code": restaurant.get("idreg"),
-                    "libelle": restaurant.get("region"),
-                },
-                "type": {
-                    "code": restaurant.get("idtpr"),
-                    "libelle": restaurant.get("type"),
-                },
-                "nom": restaurant.get("nom"),
-                "adresse": restaurant.get("adresse"),
-                "latitude": restaurant.get("latitude"),
-                "longitude": restaurant.get("longitude"),
-                "horaires": loads(restaurant.get("horaires"))
-                if restaurant.get("horaires", None)
-                else None,
-                "jours_ouvert": Opening(restaurant.get("jours_ouvert")).get(),
-                "image_url": restaurant.get("image_url"),
-                "email": restaurant.get("email"),
-                "telephone": restaurant.get("telephone"),
-                "ispmr": restaurant.get("ispmr"),
-                "zone": restaurant.get("zone"),
-                "paiement": loads(restaurant.get("paiement"))
-                if restaurant.get("paiement", None)
-                else None,
-                "acces": loads(restaurant.get("acces"))
-                if restaurant.get("acces", None)
-                else None,
-                "ouvert": restaurant.get("opened"),
-                "actif": restaurant.get("actif"),
-            }
+            catalog.fragments[restaurant["rid"]].project(fields)
+            if fields
+            else catalog.fragments[restaurant["rid"]].detail
             for restaurant in restaurants
         ],
         status=200,
@@ -203,33 +201,22 @@ async def getRestaurants(request: Request) -> JSONResponse:
     example=True,
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurants",),
+)
 async def getRestaurantsStatus(request: Request) -> JSONResponse:
     ouvert_param = request.args.get("ouvert", None)
-    restaurants = await request.app.ctx.entities.restaurants.getStatus(
+    catalog = await request.app.ctx.catalog.get()
+    restaurants = catalog.filter(
         ouvert=getBoolFromString(ouvert_param) if ouvert_param is not None else None,
     )
 
-    return JSON(
+    return JSONFragments(
         request=request,
-        success=True,
-        data=[
-            {
-                "code": restaurant.get("rid"),
-                "nom": restaurant.get("nom"),
-                "region": {
-                    "code": restaurant.get("idreg"),
-                    "libelle": restaurant.get("region"),
-                },
-                "type": {
-                    "code": restaurant.get("idtpr"),
-                    "libelle": restaurant.get("type"),
-                },
-                "ouvert": restaurant.get("opened"),
-                "actif": restaurant.get("actif"),
-            }
-            for restaurant in restaurants
-        ],
+        data=[catalog.fragments[restaurant["rid"]].status for restaurant in restaurants],
         status=200,
     ).generate()
 
@@ -260,24 +247,22 @@ async def getRestaurantsStatus(request: Request) -> JSONResponse:
     example=True,
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurants",),
+)
 async def getRestaurantsStatusMinimal(request: Request) -> JSONResponse:
     ouvert_param = request.args.get("ouvert", None)
-    restaurants = await request.app.ctx.entities.restaurants.getStatus(
+    catalog = await request.app.ctx.catalog.get()
+    restaurants = catalog.filter(
         ouvert=getBoolFromString(ouvert_param) if ouvert_param is not None else None,
     )
 
-    return JSON(
+    return JSONFragments(
         request=request,
-        success=True,
-        data=[
-            {
-                "code": restaurant.get("rid"),
-                "actif": restaurant.get("actif"),
-                "ouvert": restaurant.get("opened"),
-            }
-            for restaurant in restaurants
-        ],
+        data=[catalog.fragments[restaurant["rid"]].minimal for restaurant in restaurants],
         status=200,
     ).generate()
 
@@ -317,6 +302,14 @@ async def getRestaurantsStatusMinimal(request: Request) -> JSONResponse:
     location="path",
     example=1,
 )
+@openapi.parameter(
+    name="fields",
+    description="Champs à inclure dans la réponse, séparés par des virgules (voir le modèle Restaurant)",
+    required=False,
+    schema=str,
+    location="query",
+    example="code,nom,ouvert",
+)
 @inputs(
     Argument(
         name="code",
@@ -329,18 +322,38 @@ async def getRestaurantsStatusMinimal(request: Request) -> JSONResponse:
         deprecated=False,
     )
 )
+@inputs(
+    Argument(
+        name="fields",
+        description="Champs à inclure dans la réponse",
+        methods={"fields": Rules.restaurant_fields},
+        call=getFieldsFromString,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    )
+)
 @ratelimit()
-@cache(ttl=300)
-async def getRestaurant(request: Request, code: int) -> JSONResponse:
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurant:{code}",),
+)
+async def getRestaurant(
+    request: Request, code: int, fields: tuple[str, ...] | None = None
+) -> JSONResponse:
     """
     Retourne les détails d'un restaurant.
 
     :param code: ID du restaurant
+    :param fields: Champs à inclure dans la réponse (tous par défaut)
     :return: Le restaurant
     """
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    fragments = (await request.app.ctx.catalog.get()).fragments.get(code)
 
-    if restaurant is None:
+    if fragments is None:
         return JSON(
             request=request,
             success=False,
@@ -348,41 +361,9 @@ async def getRestaurant(request: Request, code: int) -> JSONResponse:
             status=404,
         ).generate()
 
-    return JSON(
+    return JSONFragments(
         request=request,
-        success=True,
-        data={
-            "code": restaurant.get("rid"),
-            "region": {
-                "code": restaurant.get("idreg"),
-                "libelle": restaurant.get("region"),
-            },
-            "type": {
-                "code": restaurant.get("idtpr"),
-                "libelle": restaurant.get("type"),
-            },
-            "nom": restaurant.get("nom"),
-            "adresse": restaurant.get("adresse"),
-            "latitude": restaurant.get("latitude"),
-            "longitude": restaurant.get("longitude"),
-            "horaires": loads(restaurant.get("horaires"))
-            if restaurant.get("horaires", None)
-            else None,
-            "jours_ouvert": Opening(restaurant.get("jours_ouvert")).get(),
-            "image_url": restaurant.get("image_url"),
-            "email": restaurant.get("email"),
-            "telephone": restaurant.get("telephone"),
-            "ispmr": restaurant.get("ispmr"),
-            "zone": restaurant.get("zone"),
-            "paiement": loads(restaurant.get("paiement"))
-            if restaurant.get("paiement", None)
-            else None,
-            "acces": loads(restaurant.get("acces"))
-            if restaurant.get("acces", None)
-            else None,
-            "ouvert": restaurant.get("opened"),
-            "actif": restaurant.get("actif"),
-        },
+        data=fragments.project(fields) if fields else fragments.detail,
         status=200,
     ).generate()
 
@@ -443,7 +424,7 @@ async def getRestaurant(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=60 * 5)
+@cache(ttl=60 * 60, tags=("restaurant:{code}",))  # 1 heure
 async def getRestaurantIframe(request: Request, code: int) -> HTTPResponse:
     """
     Retourne un widget Iframe d'informations d'un restaurant.
@@ -451,7 +432,7 @@ async def getRestaurantIframe(request: Request, code: int) -> HTTPResponse:
     :param code: ID du restaurant
     :return: Le widget Iframe HTML
     """
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    restaurant = (await request.app.ctx.catalog.get()).by_rid.get(code)
 
     if not restaurant:
         return JSON(
@@ -463,26 +444,9 @@ async def getRestaurantIframe(request: Request, code: int) -> HTTPResponse:
 
     preview = await request.app.ctx.entities.restaurants.getPreview(code)
 
-    parsed_restaurant = dict(restaurant)
-    if parsed_restaurant.get("horaires"):
-        try:
-            parsed_restaurant["horaires"] = loads(parsed_restaurant.get("horaires"))
-        except Exception:
-            parsed_restaurant["horaires"] = None
-    if parsed_restaurant.get("paiement"):
-        try:
-            parsed_restaurant["paiement"] = loads(parsed_restaurant.get("paiement"))
-        except Exception:
-            parsed_restaurant["paiement"] = None
-    if parsed_restaurant.get("acces"):
-        try:
-            parsed_restaurant["acces"] = loads(parsed_restaurant.get("acces"))
-        except Exception:
-            parsed_restaurant["acces"] = None
-
     template = jinja_env.get_template("iframe_info.html")
     html_content = template.render(
-        request=request, restaurant=parsed_restaurant, preview=preview is not None
+        request=request, restaurant=restaurant, preview=preview is not None
     )
 
     return raw(body=html_content, content_type="text/html; charset=utf-8", status=200)
@@ -696,7 +660,7 @@ async def getRestaurantIframe(request: Request, code: int) -> HTTPResponse:
     )
 )
 @ratelimit()
-@cache(ttl=60)
+@cache(ttl=60 * 60, tags=("restaurant:{code}",))  # 1 heure
 async def getRestaurantCustomIframe(
     request: Request,
     code: int,
@@ -761,6 +725,14 @@ async def getRestaurantCustomIframe(
     location="path",
     example=1,
 )
+@openapi.parameter(
+    name="fields",
+    description="Champs à inclure dans la réponse, séparés par des virgules (code, date, repas)",
+    required=False,
+    schema=str,
+    location="query",
+    example="code,date",
+)
 @inputs(
     Argument(
         name="code",
@@ -773,18 +745,50 @@ async def getRestaurantCustomIframe(
         deprecated=False,
     )
 )
+@inputs(
+    Argument(
+        name="fields",
+        description="Champs à inclure dans la réponse",
+        methods={"fields": Rules.menu_fields},
+        call=getFieldsFromString,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    )
+)
 @ratelimit()
-@cache(ttl=300)
-async def getRestaurantMenu(request: Request, code: int) -> JSONResponse:
+@cache(
+    ttl=60 * 60,  # 1 heure
+    lock=True,
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurant:{code}",),
+    daily=True,
+)
+async def getRestaurantMenu(
+    request: Request, code: int, fields: tuple[str, ...] | None = None
+) -> JSONResponse:
     """
     Retourne le menu d'un restaurant.
 
     :param code: ID du restaurant
+    :param fields: Champs à inclure dans la réponse (tous par défaut)
     :return: Le menu du restaurant
     """
-    menu = await request.app.ctx.entities.menus.getCurrent(
-        id=code, date=datetime.now(tz=timezone("Europe/Paris"))
-    )
+    menus = request.app.ctx.entities.menus
+    now = datetime.now(tz=timezone("Europe/Paris"))
+
+    # Sans les repas, seuls l'ID et la date des menus sont lus
+    if fields is not None and "repas" not in fields:
+        menu = await menus.getCurrentSummary(id=code, date=now)
+        days = [
+            {"code": row.get("mid"), "date": row.get("date").strftime("%d-%m-%Y")}
+            for row in menu or []
+        ]
+    else:
+        menu = await menus.getCurrent(id=code, date=now)
+        days = list(build_menu_structure(menu or []).values())
 
     if menu is None or len(menu) == 0:
         return JSON(
@@ -794,9 +798,11 @@ async def getRestaurantMenu(request: Request, code: int) -> JSONResponse:
             status=404,
         ).generate()
 
-    menu_per_day = build_menu_structure(menu)
     return JSON(
-        request=request, success=True, data=list(menu_per_day.values()), status=200
+        request=request,
+        success=True,
+        data=[project_menu(day, fields) for day in days],
+        status=200,
     ).generate()
 
 
@@ -856,7 +862,7 @@ async def getRestaurantMenu(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=60 * 5)
+@cache(ttl=60 * 60, tags=("restaurant:{code}",), daily=True)  # 1 heure
 async def getRestaurantTodayMenuIframe(request: Request, code: int) -> HTTPResponse:
     """
     Retourne un widget Iframe du menu d'un restaurant pour aujourd'hui.
@@ -916,7 +922,13 @@ async def getRestaurantTodayMenuIframe(request: Request, code: int) -> HTTPRespo
     )
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurant:{code}",),
+    daily=True,
+)
 async def getRestaurantMenuDates(request: Request, code: int) -> JSONResponse:
     """
     Retourne les dates des prochains menus disponibles
@@ -993,7 +1005,7 @@ async def getRestaurantMenuDates(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(ttl=60 * 60 * 6, tags=("restaurant:{code}",))  # 6 heures
 async def getRestaurantMenuAllDates(request: Request, code: int) -> JSONResponse:
     """
     Retourne les dates des menus disponibles
@@ -1063,6 +1075,14 @@ async def getRestaurantMenuAllDates(request: Request, code: int) -> JSONResponse
     location="path",
     example="21-10-2024",
 )
+@openapi.parameter(
+    name="fields",
+    description="Champs à inclure dans la réponse, séparés par des virgules (code, date, repas)",
+    required=False,
+    schema=str,
+    location="query",
+    example="code,date",
+)
 @inputs(
     Argument(
         name="code",
@@ -1087,19 +1107,44 @@ async def getRestaurantMenuAllDates(request: Request, code: int) -> JSONResponse
         deprecated=False,
     )
 )
+@inputs(
+    Argument(
+        name="fields",
+        description="Champs à inclure dans la réponse",
+        methods={"fields": Rules.menu_fields},
+        call=getFieldsFromString,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    )
+)
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60 * 6,  # 6 heures
+    lock=True,
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurant:{code}",),
+)
 async def getRestaurantMenuFromDate(
-    request: Request, code: int, date: datetime
+    request: Request, code: int, date: datetime, fields: tuple[str, ...] | None = None
 ) -> JSONResponse:
     """
     Retourne le menu d'un restaurant.
 
     :param code: ID du restaurant
     :param date: Date du menu
+    :param fields: Champs à inclure dans la réponse (tous par défaut)
     :return: Le menu du restaurant
     """
-    menu = await request.app.ctx.entities.menus.getFromDate(id=code, date=date)
+    menus = request.app.ctx.entities.menus
+
+    # Sans les repas, seuls l'ID et la date du menu sont lus
+    if fields is not None and "repas" not in fields:
+        menu = await menus.getSummaryFromDate(id=code, date=date)
+    else:
+        menu = await menus.getFromDate(id=code, date=date)
 
     if menu is None or len(menu) == 0:
         return JSON(
@@ -1109,10 +1154,14 @@ async def getRestaurantMenuFromDate(
             status=404,
         ).generate()
 
-    menu_per_day = build_menu_structure(menu)
     date_key = date.strftime("%d-%m-%Y")
+    if fields is not None and "repas" not in fields:
+        day = {"code": menu[0].get("mid"), "date": date_key}
+    else:
+        day = build_menu_structure(menu)[date_key]
+
     return JSON(
-        request=request, success=True, data=menu_per_day[date_key], status=200
+        request=request, success=True, data=project_menu(day, fields), status=200
     ).generate()
 
 
@@ -1192,7 +1241,7 @@ async def getRestaurantMenuFromDate(
     )
 )
 @ratelimit()
-@cache(ttl=60 * 5)
+@cache(ttl=60 * 60 * 6, tags=("restaurant:{code}",))  # 6 heures
 async def getRestaurantMenuIframe(
     request: Request, code: int, date: datetime
 ) -> HTTPResponse:
@@ -1215,7 +1264,7 @@ async def getRestaurantMenuIframe(
 )
 @openapi.response(
     status=200,
-    content={"image/png": Image},
+    content={"image/png": Image, "image/webp": Image, "image/jpeg": Image},
     description="Menu d'un restaurant sous forme d'image.",
 )
 @openapi.response(
@@ -1233,6 +1282,11 @@ async def getRestaurantMenuIframe(
     content={"application/json": RateLimited},
     description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
 )
+@openapi.response(
+    status=503,
+    content={"application/json": Unavailable},
+    description="Trop d'images sont en cours de génération. Réessayez après le délai indiqué par l'en-tête Retry-After.",
+)
 @openapi.parameter(
     name="code",
     description="ID du restaurant",
@@ -1297,6 +1351,22 @@ async def getRestaurantMenuIframe(
     location="query",
     example="#4F4F4F",
 )
+@openapi.parameter(
+    name="format",
+    description="Format de l'image (png, webp, jpeg). Par défaut, webp si l'en-tête Accept l'accepte, sinon png",
+    required=False,
+    schema=str,
+    location="query",
+    example="webp",
+)
+@openapi.parameter(
+    name="width",
+    description="Largeur de l'image en pixels (480, 960, 1280, 1920), réduite en conservant ses proportions",
+    required=False,
+    schema=int,
+    location="query",
+    example=960,
+)
 @inputs(
     Argument(
         name="code",
@@ -1321,20 +1391,53 @@ async def getRestaurantMenuIframe(
         deprecated=False,
     )
 )
+@inputs(
+    Argument(
+        name="format",
+        description="Format de l'image",
+        methods={"format": Rules.image_format},
+        call=str.lower,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    ),
+    Argument(
+        name="width",
+        description="Largeur de l'image",
+        methods={"width": Rules.image_width},
+        call=int,
+        required=False,
+        headers=False,
+        allow_multiple=False,
+        deprecated=False,
+    ),
+)
 @ratelimit()
 @cache(
-    ttl=60 * 5  # 5 minutes
+    ttl=60 * 60 * 6,  # 6 heures
+    lock=True,
+    tags=("restaurant:{code}",),
+    negotiate=("Accept", negotiate_image_format, negotiates_image_format),
 )
 async def getRestaurantMenuFromDateImage(
-    request: Request, code: int, date: datetime
+    request: Request,
+    code: int,
+    date: datetime,
+    format: str | None = None,
+    width: int | None = None,
 ) -> HTTPResponse:
     """
     Retourne le menu d'un restaurant.
 
     :param code: ID du restaurant
     :param date: Date du menu
+    :param format: Format de l'image (négocié avec l'en-tête Accept par défaut)
+    :param width: Largeur de l'image (pleine taille par défaut)
     :return: Le menu du restaurant
     """
+    format = format or negotiate_image_format(request)
+
     repas = (
         request.args.get("repas", "midi").lower()
         if request.args.get("repas", "midi").lower() in ["matin", "midi", "soir"]
@@ -1349,7 +1452,7 @@ async def getRestaurantMenuFromDateImage(
     # Parse custom colours from query parameters
     custom_colours = parse_custom_colours(request.args)
 
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    restaurant = (await request.app.ctx.catalog.get()).by_rid.get(code)
 
     if not restaurant:
         return JSON(
@@ -1364,103 +1467,39 @@ async def getRestaurantMenuFromDateImage(
     try:
         menu = await request.app.ctx.entities.menus.getFromDate(id=code, date=date)
 
-        if menu:
-            menu_per_day = {}
-            for row in menu:
-                d = row.get("date").strftime("%d-%m-%Y")
-
-                day_menu = menu_per_day.setdefault(
-                    d, {"code": row.get("mid"), "date": d, "repas": []}
-                )
-
-                repas_list = day_menu["repas"]
-
-                if not repas_list or row.get("tpr") not in repas_list[-1]["type"]:
-                    repas_list.append(
-                        {
-                            "code": row.get("rpid"),
-                            "type": row.get("tpr"),
-                            "categories": [],
-                        }
-                    )
-
-                r = repas_list[-1]
-                categories_list = r["categories"]
-
-                if (
-                    not categories_list
-                    or row.get("tpcat") not in categories_list[-1]["libelle"]
-                ):
-                    categories_list.append(
-                        {
-                            "code": row.get("catid"),
-                            "libelle": row.get("tpcat"),
-                            "ordre": row.get("cat_ordre") + 1,
-                            "plats": [],
-                        }
-                    )
-
-                if row.get("platid") is not None:
-                    categories_list[-1]["plats"].append(
-                        {
-                            "code": row.get("platid"),
-                            "ordre": row.get("plat_ordre") + 1,
-                            "libelle": row.get("plat"),
-                        }
-                    )
-
-            data = None
-            for menu in menu_per_day:
-                if date.strftime("%d-%m-%Y") == menu:
-                    for m in menu_per_day[menu]["repas"]:
-                        if m["type"] == repas:
-                            data = m
-                            break
-                    break
+        data = select_repas(menu, date, repas) if menu else None
+
+        if preview:
+            preview = preview.get("raw_image", None)
         else:
-            data = None
+            preview = None
 
-        def generate_image_in_background(
-            restaurant, menu, date, preview, theme, custom_colours
-        ):
-            image = generate(
+        renderer = request.app.ctx.renderer
+        content = await renderer.render(
+            renderer.job(
                 restaurant=restaurant,
-                menu=menu,
+                menu=data,
                 date=date,
                 preview=preview,
                 theme=theme,
                 custom_colours=custom_colours,
+                format=format,
+                width=width,
             )
-            buffer = saveImageToBuffer(image, compression_level=1)
-            return buffer.getvalue()
-
-        if preview:
-            preview = preview.get("raw_image", None)
-        else:
-            preview = None
-
-        loop = get_event_loop()
-        content = await loop.run_in_executor(
-            request.app.ctx.executor,
-            generate_image_in_background,
-            restaurant,
-            data,
-            date,
-            preview,
-            theme,
-            custom_colours,
         )
 
         return raw(
             body=content,
             status=200,
             headers={
-                "Content-Disposition": f"attachment; filename={restaurant.get('nom')} - {date.strftime('%d-%m-%Y')}.png",
+                "Content-Disposition": f"attachment; filename={restaurant.get('nom')} - {date.strftime('%d-%m-%Y')}.{format}",
                 "Content-Length": str(len(content)),
-                "Content-Type": "image/png",
+                "Content-Type": IMAGE_FORMATS[format],
             },
-            content_type="image/png",
+            content_type=IMAGE_FORMATS[format],
         )
+    except UnavailableException:
+        raise
     except Exception as e:
         logger.error(
             f"/restaurants/{code}/menu/{date.strftime('%d-%m-%Y')}/image?repas={repas}&theme={theme}",
@@ -1531,7 +1570,7 @@ async def getRestaurantMenuFromDateImage(
     )
 )
 @ratelimit()
-@cache(ttl=60 * 30)  # 30 minutes
+@cache(ttl=60 * 30, tags=("stats", "restaurant:{code}"))  # 30 minutes
 async def getRestaurantInsights(request: Request, code: int) -> JSONResponse:
     """
     Retourne les insights d'un restaurant (couverture des menus, plats fréquents).
@@ -1539,7 +1578,7 @@ async def getRestaurantInsights(request: Request, code: int) -> JSONResponse:
     :param code: ID du restaurant
     :return: Les insights du restaurant
     """
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    restaurant = (await request.app.ctx.catalog.get()).by_rid.get(code)
 
     if not restaurant:
         return JSON(
@@ -1609,7 +1648,7 @@ async def getRestaurantInsights(request: Request, code: int) -> JSONResponse:
     )
     menu_dates = {row.get("date") for row in menu_dates_rows}
 
-    opening = Opening(restaurant.get("jours_ouvert")).get()
+    opening = restaurant.get("ouverture") or []
     open_weekdays = {
         i for i, jour in enumerate(opening) if any(jour["ouverture"].values())
     }
@@ -1825,7 +1864,7 @@ async def getRestaurantInsights(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(ttl=300, tags=("restaurant:{code}",))
 async def getInformations(request: Request, code: int) -> JSONResponse:
     """
     Retourne les informations d'un restaurant.
@@ -1914,7 +1953,7 @@ async def getInformations(request: Request, code: int) -> JSONResponse:
     )
 )
 @ratelimit()
-@cache(ttl=60 * 15)  # 15 minutes
+@cache(ttl=60 * 15, tags=("restaurant:{code}",))  # 15 minutes
 async def getRestaurantActivity(request: Request, code: int) -> JSONResponse:
     """
     Retourne l'activité d'un restaurant (ajout, dernière mise à jour, historique des vérifications).
@@ -2070,7 +2109,12 @@ async def getRestaurantPreview(request: Request, code: int) -> HTTPResponse:
     description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(
+    ttl=60 * 60,  # 1 heure
+    stale_ttl=60 * 5,
+    stale_if_error=60 * 60 * 6,
+    tags=("restaurants",),
+)
 async def getTypesRestaurants(request: Request) -> JSONResponse:
     """
     Récupère les types des restaurants
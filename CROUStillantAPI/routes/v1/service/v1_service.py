@@ -57,7 +57,7 @@ async def getStatus(request: Request) -> JSONResponse:
     description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(ttl=300, stale_ttl=60 * 5, stale_if_error=60 * 60 * 6, tags=("stats",))
 async def getStats(request: Request) -> JSONResponse:
     """
     Retourne les statistiques de l'API.
@@ -102,7 +102,7 @@ async def getStats(request: Request) -> JSONResponse:
     description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
 )
 @ratelimit()
-@cache(ttl=300)
+@cache(ttl=300, stale_ttl=60 * 5, stale_if_error=60 * 60 * 6, tags=("stats",))
 async def getStatsByRegion(request: Request) -> JSONResponse:
     """
     Retourne les statistiques de l'API agrégées par région.
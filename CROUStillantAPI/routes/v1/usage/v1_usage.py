@@ -0,0 +1,147 @@
+from ....components.ratelimit import ratelimit
+from ....components.cache import cache
+from ....components.response import JSON
+from ....components.rules import Rules
+from ....models.responses import Usage
+from ....models.exceptions import RateLimited, Unauthorized
+from ....utils.rollups import percentile
+from sanic.response import JSONResponse
+from sanic import Blueprint, Request
+from sanic_ext import openapi
+from datetime import datetime, timedelta
+from pytz import timezone
+
+
+bp = Blueprint(name="Usage", url_prefix="/usage", version=1, version_prefix="v")
+
+
+def summarize(requetes: int, erreurs: int, latence: list[int]) -> dict:
+    """
+    Résume l'utilisation d'un ensemble d'agrégats.
+
+    :param requetes: Nombre de requêtes
+    :param erreurs: Nombre de requêtes en erreur
+    :param latence: Histogramme de latence
+    :return: Le résumé (requêtes, erreurs, taux d'erreur, p95)
+    """
+    return {
+        "requetes": requetes,
+        "erreurs": erreurs,
+        "taux_erreur": round(erreurs / requetes * 100, 2) if requetes else 0.0,
+        "p95": percentile(latence, 0.95),
+    }
+
+
+# /usage
+@bp.route("/", methods=["GET"])
+@openapi.definition(
+    summary="Utilisation d'une clé API",
+    description="Nombre de requêtes, taux d'erreur et 95e percentile du temps de traitement de la clé API transmise dans l'en-tête `X-API-Key`, par jour et par route. Les données sont agrégées par minute et peuvent avoir quelques secondes de retard.",
+    tag="Usage",
+)
+@openapi.response(
+    status=200,
+    content={"application/json": Usage},
+    description="Utilisation de la clé API.",
+)
+@openapi.response(
+    status=401,
+    content={"application/json": Unauthorized},
+    description="La clé API est absente ou inconnue.",
+)
+@openapi.response(
+    status=429,
+    content={"application/json": RateLimited},
+    description="Vous avez envoyé trop de requêtes. Veuillez réessayer plus tard.",
+)
+@openapi.parameter(
+    name="X-API-Key",
+    description="Clé API",
+    required=True,
+    schema=str,
+    location="header",
+)
+@openapi.parameter(
+    name="jours",
+    description="Nombre de jours (y compris aujourd'hui, entre 1 et 31)",
+    required=False,
+    schema=int,
+    location="query",
+    example=7,
+)
+@ratelimit()
+@cache(ttl=60 * 5, vary=("X-API-Key",))  # 5 minutes
+async def getUsage(request: Request) -> JSONResponse:
+    """
+    Retourne l'utilisation de la clé API de la requête.
+
+    :return: L'utilisation de la clé API
+    """
+    apikey = request.headers.get("X-API-Key", None)
+    bucket = request.app.ctx.ratelimiter.buckets.get(apikey) if apikey else None
+
+    if bucket is None:
+        return JSON(
+            request=request,
+            success=False,
+            message="Une clé API valide doit être transmise dans l'en-tête X-API-Key.",
+            status=401,
+        ).generate()
+
+    jours_raw = request.args.get("jours", "7")
+    jours = int(jours_raw) if Rules.integer(jours_raw) else 7
+    jours = max(1, min(jours, 31))
+
+    today = datetime.now(tz=timezone("Europe/Paris")).date()
+
+    rows = await request.app.ctx.entities.usage.getForKey(apikey, jours)
+
+    par_jour: dict = {}
+    par_route: dict = {}
+    total = [0, 0, None]
+    for row in rows:
+        for groupe in (
+            par_jour.setdefault(row.get("jour"), [0, 0, None]),
+            par_route.setdefault(row.get("route"), [0, 0, None]),
+            total,
+        ):
+            groupe[0] += row.get("requetes")
+            groupe[1] += row.get("erreurs")
+            groupe[2] = (
+                list(row.get("latence"))
+                if groupe[2] is None
+                else [a + b for a, b in zip(groupe[2], row.get("latence"))]
+            )
+
+    return JSON(
+        request=request,
+        success=True,
+        data={
+            "bucket": {
+                "limite": bucket.limit,
+                "periode": bucket.secs,
+            },
+            "periode": {
+                "debut": (today - timedelta(days=jours - 1)).strftime("%d-%m-%Y"),
+                "fin": today.strftime("%d-%m-%Y"),
+            },
+            "total": summarize(total[0], total[1], total[2] or []),
+            "jours": [
+                {
+                    "date": jour.strftime("%d-%m-%Y"),
+                    **summarize(*groupe),
+                }
+                for jour, groupe in par_jour.items()
+            ],
+            "routes": [
+                {
+                    "route": route,
+                    **summarize(*groupe),
+                }
+                for route, groupe in sorted(
+                    par_route.items(), key=lambda item: -item[1][0]
+                )
+            ],
+        },
+        status=200,
+    ).generate()
@@ -0,0 +1,46 @@
+from PIL import Image
+from threading import Lock
+
+
+# Images décodées, partagées par tout le processus : (chemin, taille) -> image
+_images: dict[tuple[str, tuple[int, int] | None], Image.Image] = {}
+_lock = Lock()
+
+
+def _decode(path: str) -> Image.Image:
+    """
+    Lit et décode une image, sans garder le fichier ouvert
+
+    :param path: Chemin de l'image
+    :return: L'image
+    """
+    with Image.open(path) as source:
+        source.load()
+        return source.copy()
+
+
+def load_image(path: str, size: tuple[int, int] | None = None) -> Image.Image:
+    """
+    Retourne une image décodée, éventuellement redimensionnée.
+
+    L'image est lue sur le disque à la première demande puis conservée : elle est partagée
+    entre les rendus et ne doit donc pas être modifiée par l'appelant (utiliser ``copy()``
+    pour dessiner dessus).
+
+    :param path: Chemin de l'image
+    :param size: Taille (largeur, hauteur) de l'image redimensionnée (facultatif)
+    :return: L'image
+    """
+    image = _images.get((path, size))
+    if image is not None:
+        return image
+
+    with _lock:
+        image = _images.get((path, size))
+        if image is None:
+            original = _images.get((path, None))
+            if original is None:
+                original = _images[(path, None)] = _decode(path)
+            image = _images[(path, size)] = original if size is None else original.resize(size)
+
+    return image
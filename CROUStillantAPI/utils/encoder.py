@@ -0,0 +1,106 @@
+import json
+
+from datetime import date, datetime
+from decimal import Decimal
+from dotenv import load_dotenv
+from os import environ
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+load_dotenv(dotenv_path=".env")
+
+
+def default(obj):
+    """
+    Convertit les types non pris en charge nativement par les encodeurs JSON,
+    en suivant les conventions de l'API pour les dates
+
+    :param obj: Objet à convertir
+    :return: L'objet converti
+    :raises TypeError: Si le type n'est pas pris en charge
+    """
+    if isinstance(obj, datetime):
+        return obj.strftime("%d-%m-%Y %H:%M:%S")
+    if isinstance(obj, date):
+        return obj.strftime("%d-%m-%Y")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+
+    raise TypeError(f"Type {type(obj).__name__} non sérialisable en JSON")
+
+
+def _orjson_dumps(obj) -> bytes:
+    """
+    Encode un objet en JSON avec orjson
+
+    :param obj: Objet à encoder
+    :return: Le JSON encodé en UTF-8
+    """
+    return orjson.dumps(
+        obj, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _ujson_dumps(obj) -> bytes:
+    """
+    Encode un objet en JSON avec ujson
+
+    :param obj: Objet à encoder
+    :return: Le JSON encodé en UTF-8
+    """
+    return ujson.dumps(
+        obj, default=default, ensure_ascii=False, escape_forward_slashes=False
+    ).encode()
+
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def _json_dumps(obj) -> bytes:
+    """
+    Encode un objet en JSON avec la bibliothèque standard
+
+    :param obj: Objet à encoder
+    :return: Le JSON encodé en UTF-8
+    """
+    return _json_encoder.encode(obj).encode()
+
+
+ENCODERS = {
+    "orjson": _orjson_dumps if orjson is not None else None,
+    "ujson": _ujson_dumps if ujson is not None else None,
+    "json": _json_dumps,
+}
+
+
+def get_encoder(name: str = "auto") -> callable:
+    """
+    Retourne un encodeur JSON
+
+    :param name: ``orjson``, ``ujson``, ``json``, ou ``auto`` pour le plus rapide disponible
+    :return: Fonction encodant un objet en JSON (bytes)
+    :raises ValueError: Si l'encodeur est inconnu ou n'est pas installé
+    """
+    if name == "auto":
+        return next(encoder for encoder in ENCODERS.values() if encoder is not None)
+
+    encoder = ENCODERS.get(name)
+    if encoder is None:
+        raise ValueError(f"Encodeur JSON indisponible : {name}")
+
+    return encoder
+
+
+# Encodeur utilisé par les réponses JSON de l'API
+dumps = get_encoder(environ.get("JSON_ENCODER", "auto"))
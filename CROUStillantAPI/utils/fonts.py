@@ -1,15 +1,39 @@
 from PIL import ImageFont
 from io import BytesIO
+from threading import Lock
 
 _FONT_PATH = "./assets/fonts/Inter-VariableFont.ttf"
 _data: bytes | None = None
 
+# Polices déjà construites, partagées par tout le processus : (taille, poids) -> police
+_fonts: dict[tuple[int, str], ImageFont.FreeTypeFont] = {}
+_lock = Lock()
+
 
 def make_font(size: int, weight_name: str) -> ImageFont.FreeTypeFont:
+    """
+    Retourne la police Inter pour une taille et un poids donnés.
+
+    La police est construite à la première demande puis conservée : elle est partagée
+    entre les rendus et ne doit donc pas être modifiée par l'appelant.
+
+    :param size: Taille de la police
+    :param weight_name: Nom de la variation (voir ``Weights``)
+    :return: La police
+    """
+    font = _fonts.get((size, weight_name))
+    if font is not None:
+        return font
+
     global _data
-    if _data is None:
-        with open(_FONT_PATH, "rb") as f:
-            _data = f.read()
-    font = ImageFont.truetype(BytesIO(_data), size)
-    font.set_variation_by_name(weight_name)
+    with _lock:
+        font = _fonts.get((size, weight_name))
+        if font is None:
+            if _data is None:
+                with open(_FONT_PATH, "rb") as f:
+                    _data = f.read()
+            font = ImageFont.truetype(BytesIO(_data), size)
+            font.set_variation_by_name(weight_name)
+            _fonts[(size, weight_name)] = font
+
     return font
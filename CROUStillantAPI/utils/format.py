@@ -30,3 +30,14 @@ def getIntFromString(i: str | int) -> int:
         return int(i)
     except ValueError:
         return 0
+
+
+def getFieldsFromString(f: str) -> tuple[str, ...]:
+    """
+    Convertit une liste de champs séparés par des virgules en tuple normalisé
+    (sans doublon, trié), afin que des listes équivalentes donnent le même résultat.
+
+    :param f: Chaîne de caractères (ex : ``nom,code,nom``)
+    :return: Tuple des champs (ex : ``("code", "nom")``)
+    """
+    return tuple(sorted({field.strip() for field in f.split(",") if field.strip()}))
@@ -4,7 +4,6 @@ from sanic.response import raw, HTTPResponse
 from datetime import datetime
 from pytz import timezone
 from jinja2 import Environment
-from json import loads
 
 
 _DEFAULT_BLOCKS = ["header", "status", "menu", "hours"]
@@ -33,7 +32,7 @@ async def restaurantMenuIframe(
     :return: Le menu sous forme de iframe
     :rtype: HTTPResponse
     """
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    restaurant = (await request.app.ctx.catalog.get()).by_rid.get(code)
 
     if not restaurant:
         return JSON(
@@ -152,7 +151,7 @@ async def restaurantCustomIframe(
 
     lang = lang or _DEFAULT_LANG
 
-    restaurant = await request.app.ctx.entities.restaurants.getOne(code)
+    restaurant = (await request.app.ctx.catalog.get()).by_rid.get(code)
     if not restaurant:
         return JSON(
             request=request,
@@ -161,14 +160,6 @@ async def restaurantCustomIframe(
             status=404,
         ).generate()
 
-    parsed_restaurant = dict(restaurant)
-    for field in ("horaires", "paiement", "acces"):
-        if parsed_restaurant.get(field):
-            try:
-                parsed_restaurant[field] = loads(parsed_restaurant[field])
-            except Exception:
-                parsed_restaurant[field] = None
-
     preview = (
         await request.app.ctx.entities.restaurants.getPreview(code)
         if "header" in blocks_list else None
@@ -232,7 +223,7 @@ async def restaurantCustomIframe(
     template = jinja_env.get_template("iframe_custom.html")
     html_content = template.render(
         request=request,
-        restaurant=parsed_restaurant,
+        restaurant=restaurant,
         preview=preview is not None,
         menu=menu_data,
         date_str=dt_date.strftime("%d/%m/%Y"),
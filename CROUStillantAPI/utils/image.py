@@ -2,6 +2,12 @@ from io import BytesIO
 from PIL import Image, ImageDraw
 
 
+# Types MIME des formats de sortie des images
+IMAGE_FORMATS = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+_LOSSY_QUALITY = 85  # WebP et JPEG
+
+
 def addCorners(image: Image, radius: int):
     """
     Ajoute des coins arrondis à une image.
@@ -36,15 +42,60 @@ def addCorners(image: Image, radius: int):
     return image
 
 
-def saveImageToBuffer(image: Image, compression_level: int = 1) -> BytesIO:
+def saveImageToBuffer(
+    image: Image, compression_level: int = 1, format: str = "png", width: int = None
+) -> BytesIO:
     """
     Sauvegarde une image dans un buffer avec un niveau de compression spécifié.
 
     :param image: PIL Image object.
-    :param compression_level: Compression level (0-9).
+    :param compression_level: Compression level (0-9), PNG uniquement.
+    :param format: Format de sortie (``png``, ``webp`` ou ``jpeg``).
+    :param width: Largeur de l'image réduite, en conservant ses proportions (facultatif).
     :return: BytesIO object.
     """
+    if width and width < image.width:
+        image = image.resize(
+            (width, round(image.height * width / image.width)), Image.Resampling.LANCZOS
+        )
+
     buffer = BytesIO()
-    image.save(buffer, format="PNG", compression_level=compression_level)
+    if format == "webp":
+        image.save(buffer, format="WEBP", quality=_LOSSY_QUALITY, method=4)
+    elif format == "jpeg":
+        image.convert("RGB").save(
+            buffer, format="JPEG", quality=_LOSSY_QUALITY, optimize=True, progressive=True
+        )
+    else:
+        image.save(buffer, format="PNG", compression_level=compression_level)
     buffer.seek(0)
     return buffer
+
+
+def negotiate_image_format(request) -> str:
+    """
+    Détermine le format d'une image : le paramètre ``format`` s'il est fourni, sinon
+    WebP si l'en-tête ``Accept`` du client l'accepte explicitement, sinon PNG.
+
+    :param request: Request
+    :return: ``png``, ``webp`` ou ``jpeg``
+    """
+    format = request.args.get("format")
+    if format:
+        return format.lower()
+
+    if "image/webp" in request.headers.get("accept", ""):
+        return "webp"
+
+    return "png"
+
+
+def negotiates_image_format(request) -> bool:
+    """
+    Indique si le format d'une image est négocié avec l'en-tête ``Accept``,
+    c'est-à-dire si le paramètre ``format`` n'est pas fourni.
+
+    :param request: Request
+    :return: True si la réponse dépend de l'en-tête ``Accept``
+    """
+    return not request.args.get("format")
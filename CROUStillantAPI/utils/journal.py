@@ -0,0 +1,253 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from uuid import uuid4
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+_OPEN_SUFFIX = ".open"
+_SEGMENT_SUFFIX = ".ndjson"
+_REPLAY_SUFFIX = ".replay"
+
+
+def _pid_alive(pid: int) -> bool:
+    """
+    Indique si un processus existe encore
+
+    :param pid: PID du processus
+    :return: True si le processus est vivant
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> str | None:
+    """
+    Lit la date de démarrage d'un processus (en ticks depuis le démarrage du système)
+
+    :param pid: PID du processus
+    :return: La date de démarrage, ou None si elle n'est pas disponible (processus absent, hors Linux)
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as file:
+            stat = file.read()
+    except OSError:
+        return None
+
+    # Le nom du processus (2e champ) peut contenir des espaces : on repart de la dernière parenthèse
+    fields = stat[stat.rindex(b")") + 2:].split()
+    return fields[19].decode() if len(fields) > 19 else None
+
+
+def _owner_alive(owner: str, current: str) -> bool:
+    """
+    Indique si le processus propriétaire d'un segment est encore en vie.
+
+    Un propriétaire est identifié par ``<pid>_<jeton>``, le jeton étant la date de démarrage
+    du processus (ou un jeton aléatoire si elle n'est pas disponible) : après un redémarrage,
+    un PID réutilisé par un autre processus ne suffit pas à garder le segment.
+
+    :param owner: Propriétaire du segment
+    :param current: Propriétaire correspondant au processus courant
+    :return: True si le segment appartient à un processus vivant
+    """
+    pid, _, token = owner.partition("_")
+    if not pid.isdigit():
+        return True  # Nom inconnu : on n'y touche pas
+
+    if pid == current.partition("_")[0]:
+        return owner == current  # Même PID, autre jeton : processus précédent
+
+    if not _pid_alive(int(pid)):
+        return False
+
+    start = _process_start(int(pid))
+    if start is None or not token.isdigit():
+        return True  # Date de démarrage invérifiable : le PID vivant fait foi
+    return token == start
+
+
+class SpillJournal:
+    """
+    Journal append-only sur disque, découpé en segments NDJSON (une ligne JSON par entrée).
+
+    Chaque worker écrit dans son propre segment ``<propriétaire>-<horodatage>.ndjson.open``,
+    renommé en ``.ndjson`` une fois plein ou à la fermeture. Pour être rejoué, un segment est
+    d'abord réservé en le renommant ``.ndjson.<propriétaire>.replay`` (renommage atomique), ce
+    qui permet à plusieurs workers de partager le même dossier. Le propriétaire est
+    ``<pid>_<date de démarrage du processus>`` : les segments laissés par un processus arrêté
+    brutalement sont repris par les autres, ou par son successeur s'il réutilise le même PID.
+
+    Les accès disque sont exécutés dans un thread pour ne pas bloquer la boucle d'événements.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024) -> None:
+        """
+        :param directory: Dossier des segments
+        :param segment_bytes: Taille à partir de laquelle un nouveau segment est ouvert
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.pid = os.getpid()
+        self.owner = f"{self.pid}_{_process_start(self.pid) or uuid4().hex}"
+
+        self._segment: str | None = None
+        self._size = 0
+        self._lock = asyncio.Lock()
+
+    async def append(self, entries: list) -> None:
+        """
+        Ajoute des entrées au segment courant
+
+        :param entries: Entrées sérialisables en JSON
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._append, entries)
+
+    async def close(self) -> None:
+        """
+        Ferme le segment courant pour qu'il puisse être rejoué
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._close)
+
+    async def replay(self, insert: callable, batch_size: int) -> int:
+        """
+        Rejoue tous les segments disponibles, par lots
+
+        En cas d'échec, les entrées non insérées sont réécrites dans un nouveau segment
+        et l'exception est propagée.
+
+        :param insert: Coroutine insérant un lot d'entrées
+        :param batch_size: Nombre d'entrées par lot
+        :return: Nombre d'entrées rejouées
+        """
+        await self.close()
+
+        replayed = 0
+        while True:
+            path = await asyncio.to_thread(self._claim)
+            if path is None:
+                return replayed
+
+            entries = await asyncio.to_thread(self._read, path)
+
+            for i in range(0, len(entries), batch_size):
+                try:
+                    await insert(entries[i:i + batch_size])
+                except BaseException:
+                    await asyncio.to_thread(self._requeue, path, entries[i:])
+                    raise
+                replayed += min(batch_size, len(entries) - i)
+
+            await asyncio.to_thread(os.unlink, path)
+
+            _LOGGER.info("Replayed %d spilled entries from %s", len(entries), path)
+
+    def _append(self, entries: list) -> None:
+        """
+        Écrit des entrées à la fin du segment courant puis force leur écriture sur disque
+
+        :param entries: Entrées sérialisables en JSON
+        """
+        if self._segment is None or self._size >= self.segment_bytes:
+            self._close()
+            os.makedirs(self.directory, exist_ok=True)
+            self._segment = os.path.join(
+                self.directory, f"{self.owner}-{time.time_ns()}{_SEGMENT_SUFFIX}{_OPEN_SUFFIX}"
+            )
+            self._size = 0
+
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode()
+        with open(self._segment, "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._size += len(data)
+
+    def _close(self) -> None:
+        """
+        Renomme le segment courant en segment rejouable
+        """
+        if self._segment is None:
+            return
+
+        os.replace(self._segment, self._segment.removesuffix(_OPEN_SUFFIX))
+        self._segment = None
+        self._size = 0
+
+    def _claim(self) -> str | None:
+        """
+        Réserve le plus ancien segment rejouable
+
+        :return: Chemin du segment réservé, ou None s'il n'y en a aucun
+        """
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return None
+
+        for name in names:
+            if name.endswith(_SEGMENT_SUFFIX):
+                base = name
+            elif name.endswith(_OPEN_SUFFIX) or name.endswith(_REPLAY_SUFFIX):
+                # Segment d'un autre processus : repris seulement si celui-ci n'existe plus
+                owner = name.split(".")[-2] if name.endswith(_REPLAY_SUFFIX) else name.split("-")[0]
+                if _owner_alive(owner, self.owner):
+                    continue
+                base = name[:name.index(_SEGMENT_SUFFIX) + len(_SEGMENT_SUFFIX)]
+            else:
+                continue
+
+            claimed = os.path.join(self.directory, f"{base}.{self.owner}{_REPLAY_SUFFIX}")
+            try:
+                os.rename(os.path.join(self.directory, name), claimed)
+            except FileNotFoundError:
+                continue  # Réservé par un autre worker entre-temps
+
+            return claimed
+
+        return None
+
+    def _read(self, path: str) -> list:
+        """
+        Lit les entrées d'un segment, en ignorant une éventuelle dernière ligne tronquée
+
+        :param path: Chemin du segment
+        :return: Les entrées
+        """
+        entries = []
+        with open(path, "rb") as file:
+            for line in file:
+                try:
+                    entries.append(tuple(json.loads(line)))
+                except ValueError:
+                    _LOGGER.warning("Skipping corrupt line in spill segment %s", path)
+        return entries
+
+    def _requeue(self, path: str, entries: list) -> None:
+        """
+        Réécrit les entrées non rejouées d'un segment réservé dans un nouveau segment
+
+        :param path: Chemin du segment réservé
+        :param entries: Entrées restantes
+        """
+        remaining = os.path.join(self.directory, f"{self.owner}-{time.time_ns()}{_SEGMENT_SUFFIX}")
+        with open(remaining + _OPEN_SUFFIX, "wb") as file:
+            file.write("".join(json.dumps(list(entry)) + "\n" for entry in entries).encode())
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(remaining + _OPEN_SUFFIX, remaining)
+        os.unlink(path)
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+
 def build_menu_structure(rows: list) -> dict[str, dict]:
     """
     Convertit une liste de lignes plates (asyncpg) en une structure imbriquée
@@ -45,3 +48,44 @@ def build_menu_structure(rows: list) -> dict[str, dict]:
             )
 
     return menu_per_day
+
+
+def project_menu(menu: dict, fields: tuple[str, ...] | None) -> dict:
+    """
+    Réduit un menu structuré aux champs demandés (paramètre ``fields``).
+
+    :param menu: Menu retourné par :func:`build_menu_structure`
+    :type menu: dict
+    :param fields: Champs conservés, ou None pour tous les conserver
+    :type fields: tuple[str, ...] | None
+    :return: Le menu réduit
+    :rtype: dict
+    """
+    if fields is None:
+        return menu
+
+    return {field: value for field, value in menu.items() if field in fields}
+
+
+def select_repas(rows: list, date: datetime, repas: str) -> dict | None:
+    """
+    Extrait un repas du menu d'une date, tel qu'affiché sur l'image du menu.
+
+    :param rows: Les lignes retournées par ``Menus.getFromDate``.
+    :type rows: list
+    :param date: Date du menu.
+    :type date: datetime
+    :param repas: Type du repas (``matin``, ``midi`` ou ``soir``).
+    :type repas: str
+    :return: Le repas (code, type, catégories), ou None s'il n'existe pas.
+    :rtype: dict | None
+    """
+    day_menu = build_menu_structure(rows).get(date.strftime("%d-%m-%Y"))
+    if day_menu is None:
+        return None
+
+    for m in day_menu["repas"]:
+        if m["type"] == repas:
+            return m
+
+    return None
@@ -0,0 +1,130 @@
+import time
+
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+
+# Bornes supérieures (en ms) des classes de l'histogramme de latence, la dernière classe est ouverte
+LATENCY_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+# (minute, route, status, bucket, key)
+_RollupKey = tuple[int, str, int, str, str]
+
+
+class RollupAggregator:
+    """
+    Agrégateur en mémoire des requêtes par minute, route, statut, bucket et clé API.
+
+    Chaque agrégat contient le nombre de requêtes, leur temps de traitement cumulé
+    et un histogramme de latence dont les classes sont définies par ``LATENCY_BOUNDS``.
+    """
+
+    def __init__(self) -> None:
+        self._rollups: dict[_RollupKey, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._rollups)
+
+    def add(self, route: str, status: int, bucket: str, key: str, process_time: int) -> None:
+        """
+        Comptabilise une requête dans l'agrégat de la minute courante
+
+        :param route: Modèle de la route (ex : ``/v1/restaurants/<code:int>``)
+        :param status: Code de statut de la réponse
+        :param bucket: Bucket de rate limiting appliqué
+        :param key: Clé API
+        :param process_time: Temps de traitement, en ms
+        """
+        rollup_key = (int(time.time()) // 60 * 60, route, status, bucket, key)
+
+        rollup = self._rollups.get(rollup_key)
+        if rollup is None:
+            rollup = self._rollups[rollup_key] = [0, 0, [0] * (len(LATENCY_BOUNDS) + 1)]
+
+        process_time = max(process_time, 0)
+        rollup[0] += 1
+        rollup[1] += process_time
+        rollup[2][bisect_left(LATENCY_BOUNDS, process_time)] += 1
+
+    def drain(self) -> list[tuple]:
+        """
+        Vide l'agrégateur
+
+        :return: Les agrégats, triés par clé, sous forme de lignes
+            ``(minute, route, status, bucket, key, count, total_time, latency)``
+        """
+        rollups, self._rollups = self._rollups, {}
+
+        return [
+            (
+                datetime.fromtimestamp(minute, tz=timezone.utc),
+                route,
+                status,
+                bucket,
+                key,
+                count,
+                total_time,
+                latency,
+            )
+            for (minute, route, status, bucket, key), (count, total_time, latency) in sorted(
+                rollups.items()
+            )
+        ]
+
+    def merge(self, rows: list[tuple]) -> None:
+        """
+        Réintègre des agrégats non enregistrés
+
+        :param rows: Lignes retournées par :meth:`drain`
+        """
+        for minute, route, status, bucket, key, count, total_time, latency in rows:
+            rollup_key = (int(minute.timestamp()), route, status, bucket, key)
+
+            rollup = self._rollups.get(rollup_key)
+            if rollup is None:
+                self._rollups[rollup_key] = [count, total_time, list(latency)]
+                continue
+
+            rollup[0] += count
+            rollup[1] += total_time
+            rollup[2] = [a + b for a, b in zip(rollup[2], latency)]
+
+    def truncate(self, max_size: int) -> int:
+        """
+        Supprime les agrégats les plus anciens au-delà d'une taille maximale
+
+        :param max_size: Nombre maximal d'agrégats conservés
+        :return: Nombre d'agrégats supprimés
+        """
+        dropped = len(self._rollups) - max_size
+        if dropped <= 0:
+            return 0
+
+        for rollup_key in sorted(self._rollups)[:dropped]:
+            del self._rollups[rollup_key]
+
+        return dropped
+
+
+def percentile(latency: list[int], q: float) -> int | None:
+    """
+    Estime un percentile de latence à partir d'un histogramme
+
+    :param latency: Histogramme de latence (une valeur par classe de ``LATENCY_BOUNDS``, plus la classe ouverte)
+    :param q: Percentile recherché, entre 0 et 1 (ex : ``0.95``)
+    :return: La borne supérieure de la classe contenant le percentile, en ms
+        (``LATENCY_BOUNDS[-1]`` pour la classe ouverte), ou None si l'histogramme est vide
+    """
+    total = sum(latency)
+    if total == 0:
+        return None
+
+    rank = q * total
+    seen = 0
+    for bound, count in zip((*LATENCY_BOUNDS, LATENCY_BOUNDS[-1]), latency):
+        seen += count
+        if seen >= rank:
+            return bound
+
+    return LATENCY_BOUNDS[-1]
@@ -0,0 +1,156 @@
+"""
+Benchmark de l'insertion des logs d'analyse : ``executemany`` contre ``COPY`` binaire.
+
+Les lignes ont la forme des entrées de ``Analytics`` et sont insérées par lots de
+``_BATCH_SIZE`` dans une table temporaire de même structure que ``requests_logs``.
+
+Utilisation (variables POSTGRES_* du fichier .env) :
+
+    python benchmarks/bench_analytics_flush.py --rows 50000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+
+from asyncpg import connect
+from dotenv import load_dotenv
+from os import environ
+
+
+load_dotenv(dotenv_path=".env")
+
+
+_BATCH_SIZE = 500
+
+_COLUMNS = (
+    "id", "key", "method", "path", "status", "params", "request_headers",
+    "ratelimit_limit", "ratelimit_remaining", "ratelimit_used",
+    "ratelimit_reset", "ratelimit_bucket", "process_time",
+    "api_version", "hashed_ip",
+)
+
+_CREATE_SQL = """
+    CREATE TEMPORARY TABLE bench_requests_logs (
+        id TEXT,
+        key TEXT,
+        method TEXT,
+        path TEXT,
+        status INTEGER,
+        params JSONB,
+        request_headers JSONB,
+        ratelimit_limit TEXT,
+        ratelimit_remaining TEXT,
+        ratelimit_used TEXT,
+        ratelimit_reset TEXT,
+        ratelimit_bucket TEXT,
+        process_time INTEGER,
+        api_version TEXT,
+        hashed_ip TEXT
+    )
+"""
+
+_INSERT_SQL = f"""
+    INSERT INTO bench_requests_logs ({", ".join(_COLUMNS)})
+    VALUES ({", ".join(f"${i}" for i in range(1, len(_COLUMNS) + 1))})
+"""
+
+
+def make_rows(count: int) -> list[tuple]:
+    """
+    Génère des lignes représentatives des requêtes de l'API
+
+    :param count: Nombre de lignes
+    :return: Les lignes
+    """
+    headers = json.dumps(
+        {
+            "host": "api.croustillant.menu",
+            "user-agent": "MonApplication/1.0 (contact@example.com)",
+            "accept": "application/json",
+            "accept-encoding": "gzip, br",
+            "cf-ipcountry": "FR",
+        }
+    )
+    return [
+        (
+            str(uuid.uuid4()),
+            None,
+            "GET",
+            f"/v1/restaurants/{i % 900}/menu",
+            200,
+            json.dumps({}),
+            headers,
+            "200",
+            str(200 - i % 200),
+            str(i % 200),
+            "42",
+            "3792010123",
+            i % 50,
+            "1.2.1",
+            hashlib.blake2b(str(i).encode(), digest_size=20).hexdigest(),
+        )
+        for i in range(count)
+    ]
+
+
+async def bench(conn, name: str, rows: list[tuple], insert) -> float:
+    """
+    Insère toutes les lignes par lots et mesure le débit
+
+    :param conn: Connexion à la base de données
+    :param name: Nom de la méthode
+    :param rows: Lignes à insérer
+    :param insert: Coroutine d'insertion d'un lot
+    :return: Lignes insérées par seconde
+    """
+    await conn.execute("TRUNCATE bench_requests_logs")
+
+    start = time.perf_counter()
+    for i in range(0, len(rows), _BATCH_SIZE):
+        await insert(rows[i:i + _BATCH_SIZE])
+    elapsed = time.perf_counter() - start
+
+    rate = len(rows) / elapsed
+    print(f"{name:<12} {len(rows):>8} lignes en {elapsed:6.2f} s  →  {rate:>10.0f} lignes/s")
+    return rate
+
+
+async def main(count: int) -> None:
+    conn = await connect(
+        database=environ["POSTGRES_DATABASE"],
+        user=environ["POSTGRES_USER"],
+        password=environ["POSTGRES_PASSWORD"],
+        host=environ["POSTGRES_HOST"],
+        port=environ["POSTGRES_PORT"],
+    )
+    try:
+        await conn.execute(_CREATE_SQL)
+        rows = make_rows(count)
+
+        executemany = await bench(
+            conn, "executemany", rows, lambda batch: conn.executemany(_INSERT_SQL, batch)
+        )
+        copy = await bench(
+            conn,
+            "copy",
+            rows,
+            lambda batch: conn.copy_records_to_table(
+                "bench_requests_logs", records=batch, columns=_COLUMNS
+            ),
+        )
+
+        print(f"COPY est {copy / executemany:.1f}x plus rapide")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="Nombre de lignes à insérer")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows))
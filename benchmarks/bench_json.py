@@ -0,0 +1,156 @@
+"""
+Benchmark de l'encodage JSON des réponses : encodeur par défaut de Sanic contre les
+encodeurs de ``CROUStillantAPI.utils.encoder``.
+
+Les charges ont la forme des réponses de ``/v1/restaurants`` et ``/v1/restaurants/{code}/menu``.
+Pour l'encodeur par défaut, les dates sont formatées avec ``strftime`` avant l'encodage,
+comme dans les routes ; les autres encodeurs reçoivent directement les objets ``date``.
+
+Utilisation :
+
+    python benchmarks/bench_json.py --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CROUStillantAPI.utils.encoder import ENCODERS  # noqa: E402
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def sanic_dumps(obj) -> bytes:
+    """
+    Reproduit l'encodeur par défaut de Sanic (ujson s'il est installé)
+    """
+    if ujson is not None:
+        return ujson.dumps(obj, escape_forward_slashes=False).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def restaurants_payload(count: int) -> dict:
+    """
+    Réponse de ``/v1/restaurants`` avec ``count`` restaurants
+    """
+    return {
+        "success": True,
+        "data": [
+            {
+                "code": rid,
+                "region": {"code": rid % 30, "libelle": "Bordeaux-Aquitaine"},
+                "type": {"code": rid % 5, "libelle": "Restaurant"},
+                "nom": f"Restaurant Universitaire n°{rid}",
+                "adresse": f"{rid} avenue de l'Université, 64000 Pau",
+                "latitude": 43.3 + rid / 1000,
+                "longitude": -0.36 + rid / 1000,
+                "horaires": ["Du lundi au vendredi : 11h30 - 13h30", "Le soir : 18h30 - 20h00"],
+                "jours_ouvert": [
+                    {"jour": jour, "ouverture": {"matin": False, "midi": True, "soir": rid % 2 == 0}}
+                    for jour in ("Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche")
+                ],
+                "image_url": f"https://api.croustillant.menu/v1/restaurants/{rid}/preview",
+                "email": "contact@crous.fr",
+                "telephone": "05 59 00 00 00",
+                "ispmr": True,
+                "zone": "Pau",
+                "paiement": ["IZLY", "Espèces"],
+                "acces": ["Bus 2, 4, 6, 13"],
+                "ouvert": True,
+                "actif": True,
+            }
+            for rid in range(count)
+        ],
+    }
+
+
+def menu_payload(days: int, format_dates: bool) -> dict:
+    """
+    Réponse de ``/v1/restaurants/{code}/menu`` sur ``days`` jours
+    """
+    start = date(2026, 9, 1)
+    return {
+        "success": True,
+        "data": [
+            {
+                "code": 1000 + day,
+                "date": (start + timedelta(days=day)).strftime("%d-%m-%Y")
+                if format_dates
+                else start + timedelta(days=day),
+                "repas": [
+                    {
+                        "code": 5000 + day * 2 + r,
+                        "type": repas,
+                        "categories": [
+                            {
+                                "code": c,
+                                "libelle": f"Catégorie {c}",
+                                "ordre": c,
+                                "plats": [
+                                    {"code": 10_000 + p, "ordre": p, "libelle": f"Plat n°{p} à la crème"}
+                                    for p in range(6)
+                                ],
+                            }
+                            for c in range(4)
+                        ],
+                    }
+                    for r, repas in enumerate(("midi", "soir"))
+                ],
+            }
+            for day in range(days)
+        ],
+    }
+
+
+def measure(dumps: callable, payload: dict, repeat: int) -> tuple[float, int]:
+    """
+    Mesure le temps moyen d'encodage d'une charge
+
+    :return: Temps moyen en ms, taille du JSON en octets
+    """
+    size = len(dumps(payload))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dumps(payload)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / repeat * 1000, size
+
+
+def main(repeat: int, restaurants: int, days: int) -> None:
+    payloads = {
+        "/restaurants": (restaurants_payload(restaurants), restaurants_payload(restaurants)),
+        "/menu": (menu_payload(days, format_dates=True), menu_payload(days, format_dates=False)),
+    }
+
+    encoders = {"sanic": sanic_dumps}
+    encoders.update({name: dumps for name, dumps in ENCODERS.items() if dumps is not None})
+
+    for route, (formatted, native) in payloads.items():
+        baseline = None
+        print(f"{route} ({repeat} encodages)")
+        for name, dumps in encoders.items():
+            payload = formatted if name == "sanic" else native
+            ms, size = measure(dumps, payload, repeat)
+            baseline = baseline or ms
+            print(f"  {name:<8} {ms:8.3f} ms  {size:>9} octets  x{baseline / ms:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Nombre d'encodages par mesure")
+    parser.add_argument("--restaurants", type=int, default=900, help="Nombre de restaurants")
+    parser.add_argument("--days", type=int, default=14, help="Nombre de jours de menu")
+    args = parser.parse_args()
+
+    main(args.repeat, args.restaurants, args.days)
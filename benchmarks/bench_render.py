@@ -0,0 +1,115 @@
+"""
+Benchmark du rendu des images des menus : débit (rendus par seconde) avec un
+``ThreadPoolExecutor`` contre un ``ProcessPoolExecutor``, pour un nombre croissant
+de workers.
+
+Les tâches ont la forme de celles construites par ``Renderer.job`` pour
+``/v1/restaurants/{code}/menu/{date}/image``. Le script doit être lancé depuis la
+racine du dépôt, avec le sous-module ``assets`` initialisé.
+
+Utilisation :
+
+    python benchmarks/bench_render.py --renders 64 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CROUStillantAPI.components.renderer import Renderer, render, _init_worker  # noqa: E402
+
+
+def make_job() -> dict:
+    """
+    Tâche de rendu d'un menu de midi bien rempli
+    """
+    restaurant = {
+        "nom": "Restaurant Universitaire du Campus",
+        "opened": True,
+        "horaires": ["Du lundi au vendredi : 11h30 - 13h30", "Le soir : 18h30 - 20h00"],
+        "email": "contact@crous.fr",
+        "telephone": "05 59 00 00 00",
+        "paiement": ["IZLY", "Carte bancaire"],
+        "zone": "Pau",
+        "adresse": "7 avenue de l'Université, 64000 Pau",
+        "acces": ["Bus 2, 4, 6, 13", "Parking vélos"],
+    }
+    menu = {
+        "code": 1,
+        "type": "midi",
+        "categories": [
+            {
+                "code": c,
+                "libelle": f"Catégorie n°{c}",
+                "ordre": c,
+                "plats": [
+                    {"code": p, "ordre": p, "libelle": f"Plat n°{p} à la crème et aux légumes de saison"}
+                    for p in range(5)
+                ],
+            }
+            for c in range(5)
+        ],
+    }
+
+    return Renderer.job(
+        restaurant=restaurant,
+        menu=menu,
+        date=datetime(2026, 9, 1),
+        preview=None,
+        theme="light",
+        custom_colours=None,
+    )
+
+
+def measure(executor, job: dict, renders: int) -> float:
+    """
+    Mesure le débit d'un executor
+
+    :return: Rendus par seconde
+    """
+    start = time.perf_counter()
+    for future in [executor.submit(render, job) for _ in range(renders)]:
+        future.result()
+    elapsed = time.perf_counter() - start
+
+    return renders / elapsed
+
+
+def main(renders: int, workers: list[int]) -> None:
+    job = make_job()
+    _init_worker()
+
+    print(f"{renders} rendus, {os.cpu_count()} cœurs")
+    print(f"  {'workers':>7}  {'threads':>10}  {'processus':>10}")
+    for count in workers:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            threads = measure(executor, job, renders)
+
+        with ProcessPoolExecutor(
+            max_workers=count,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as executor:
+            # Démarre les processus (et précharge leurs ressources) hors de la mesure
+            list(executor.map(int, range(count)))
+            processes = measure(executor, job, renders)
+
+        print(f"  {count:>7}  {threads:>8.1f}/s  {processes:>8.1f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=64, help="Nombre de rendus par mesure")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4], help="Nombres de workers testés"
+    )
+    args = parser.parse_args()
+
+    main(args.renders, args.workers)
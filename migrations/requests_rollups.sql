@@ -0,0 +1,15 @@
+-- Agrégats des requêtes par minute, route, statut, bucket et clé API
+-- (alimentés par CROUStillantAPI/components/analytics.py, lus par /v1/usage)
+CREATE TABLE IF NOT EXISTS requests_rollups (
+    minute TIMESTAMPTZ NOT NULL,
+    route TEXT NOT NULL,
+    status SMALLINT NOT NULL,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_time BIGINT NOT NULL,
+    latency INTEGER[] NOT NULL,
+    PRIMARY KEY (minute, route, status, bucket, key)
+);
+
+CREATE INDEX IF NOT EXISTS requests_rollups_key_minute ON requests_rollups (key, minute);